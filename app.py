@@ -1,5 +1,6 @@
 import streamlit as st
-from graph import job_tracker_app
+from graph import job_tracker_app, STEPS
+from batch_runner import BackgroundBatch
 import json
 from datetime import datetime
 import pandas as pd
@@ -73,11 +74,17 @@ if mode == "Single Job":
                 
                 # Show initial progress
                 status_text.text("Running LangGraph workflow...")
-                progress_bar.progress(10)
+                progress_bar.progress(0)
                 
-                # Run the graph and capture logs
+                # Run the graph and capture logs, moving the progress bar as each node finishes
+                final_state = dict(initial_input)
                 with redirect_stdout(log_capture):
-                    final_state = job_tracker_app.invoke(initial_input)
+                    for update in job_tracker_app.stream(initial_input, stream_mode="updates"):
+                        for node, values in update.items():
+                            final_state.update(values or {})
+                            if node in STEPS:
+                                progress_bar.progress((STEPS.index(node) + 1) / len(STEPS))
+                                status_text.text(f"Finished step: {node}")
                 
                 # Display captured logs
                 logs = log_capture.getvalue()
@@ -89,7 +96,10 @@ if mode == "Single Job":
                 status_text.text("Complete!")
                 
                 # Check results and display
-                if final_state.get('save_status') == 'success':
+                if final_state.get('is_duplicate'):
+                    st.info("This job is already in your tracker - skipped.")
+                
+                elif final_state.get('save_status') == 'success':
                     st.success("Job Added to Tracker!")
                   
                 
@@ -141,75 +151,56 @@ else:  # Batch mode
     if job_urls:
         st.info(f"{len(job_urls)} jobs to process")
     
-    # Process button
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        batch_button = st.button(
-            f"Process {len(job_urls)} Jobs" if job_urls else "Process Batch",
-            use_container_width=True,
-            type="primary",
-            disabled=len(job_urls) == 0
-        )
+    max_concurrent = st.sidebar.number_input(
+        "Concurrent jobs",
+        min_value=1,
+        max_value=50,
+        value=5,
+        help="How many jobs are processed at the same time"
+    )
     
-    if batch_button and job_urls:
-        st.markdown("---")
-        
-        # Progress tracking
-        progress_bar = st.progress(0)
-        status_container = st.empty()
-        
-        # Results tracking
-        results = []
-        successful = 0
-        duplicates = 0
-        failed = 0
+    def result_row(job):
+        """
+        Results table row for a finished job
+        """
+        details = job['details'] or {}
+        return {
+            'Status': job['status'],
+            'Job Title': details.get('Job Title', '-'),
+            'Company': details.get('Company', '-'),
+            'Location': details.get('Location', '-'),
+            'Row': job['row'] or '-',
+            'URL': job['url']
+        }
+    
+    def show_batch(batch, polling):
+        """
+        Live progress, results so far and summary of the background batch
+        """
+        # The batch finished since the last poll: rerun the page once to stop polling
+        if polling and batch.done:
+            st.rerun()
         
-        # Process each job
-        for i, url in enumerate(job_urls):
-            progress = (i + 1) / len(job_urls)
-            progress_bar.progress(progress)
-            status_container.info(f"Processing job {i+1}/{len(job_urls)}: {url[:50]}...")
-            
-            try:
-                final_state = job_tracker_app.invoke({"job_url": url})
-                
-                if final_state.get('save_status') == 'success':
-                    successful += 1
-                    details = final_state['final_details']
-                    results.append({
-                        'Status': 'Success',
-                        'Job Title': details['Job Title'],
-                        'Company': details['Company'],
-                        'Location': details['Location'],
-                        'Row': final_state.get('tracker_id'),
-                        'URL': url
-                    })
-
-                else:
-                    failed += 1
-                    results.append({
-                        'Status': 'Failed',
-                        'Job Title': '-',
-                        'Company': '-',
-                        'Location': '-',
-                        'Row': '-',
-                        'URL': url
-                    })
-            
-            except Exception as e:
-                failed += 1
-                results.append({
-                    'Status': f'Error',
-                    'Job Title': '-',
-                    'Company': '-',
-                    'Location': '-',
-                    'Row': '-',
-                    'URL': url
-                })
+        jobs = batch.snapshot()
+        finished = [job for job in jobs if job['status'] not in ('Queued', 'Running')]
+        in_progress = [job for job in jobs if job['status'] == 'Running']
         
-        # Complete
-        progress_bar.progress(1.0)
-        status_container.success("Batch processing complete!")
+        st.progress(batch.progress())
+        if not batch.done:
+            st.info(f"Processed {len(finished)}/{len(jobs)} jobs ({len(in_progress)} running)...")
+            if st.button("Cancel Batch", disabled=batch.cancelled):
+                batch.cancel()
+            if in_progress:
+                st.markdown("#### In Progress")
+                st.dataframe(
+                    pd.DataFrame([{'URL': job['url'], 'Step': job['node'] or 'starting'} for job in in_progress]),
+                    use_container_width=True
+                )
+        elif batch.cancelled:
+            processed = sum(1 for job in finished if job['status'] != 'Cancelled')
+            st.warning(f"Batch cancelled: {processed} of {len(jobs)} jobs were processed.")
+        else:
+            st.success("Batch processing complete!")
         
         # Summary
         st.markdown("---")
@@ -217,25 +208,53 @@ else:  # Batch mode
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Successful", successful)
+            st.metric("Successful", sum(1 for job in jobs if job['status'] == 'Success'))
         with col2:
-            st.metric("Failed", failed)
+            st.metric("Failed", sum(1 for job in jobs if job['status'] in ('Failed', 'Error')))
         with col3:
-            st.metric("Total", len(job_urls))
+            st.metric("Duplicates", sum(1 for job in jobs if job['status'] == 'Duplicate'))
+        with col4:
+            st.metric("Total", len(jobs))
         
-        # Results table
+        # Results table, growing as jobs finish
         st.markdown("### Detailed Results")
-        df = pd.DataFrame(results)
+        df = pd.DataFrame([result_row(job) for job in finished])
         st.dataframe(df, use_container_width=True)
         
         # Download results
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label=" Download Results CSV",
-            data=csv,
-            file_name=f"job_tracker_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+        if batch.done:
+            csv = df.to_csv(index=False)
+            st.download_button(
+                label=" Download Results CSV",
+                data=csv,
+                file_name=f"job_tracker_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
+    
+    batch = st.session_state.get('batch')
+    running = batch is not None and not batch.done
+    
+    # Process button
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        batch_button = st.button(
+            f"Process {len(job_urls)} Jobs" if job_urls else "Process Batch",
+            use_container_width=True,
+            type="primary",
+            disabled=len(job_urls) == 0 or running
         )
+    
+    if batch_button and job_urls:
+        # Jobs run concurrently on a background thread; the page polls their progress
+        batch = BackgroundBatch(job_urls, max_concurrent=int(max_concurrent))
+        batch.start()
+        st.session_state.batch = batch
+        running = True
+    
+    if batch is not None:
+        st.markdown("---")
+        # Only the progress section reruns while polling, not the whole page
+        st.fragment(show_batch, run_every=1.0 if running else None)(batch, running)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import config
+from graph import job_tracker_app, STEPS
+from utils.http_client import aclose_http_clients
+from utils.sheets_client import SheetsWriteBuffer
+from utils.tracker_sink import get_tracker_sink
+
+
+class BackgroundBatch:
+    """
+    Runs a batch of jobs concurrently on a background thread
+
+    Meant for UIs that must stay responsive: start() returns right away,
+    and snapshot() can be polled for each job's status and the node it
+    has got to (taken from the graph's streamed updates). cancel() stops
+    jobs that are still queued or running.
+    """
+
+    def __init__(self, job_urls: List[str], max_concurrent: int = 5, lean_state: bool = config.LEAN_STATE):
+        self.max_concurrent = max_concurrent
+        self.lean_state = lean_state
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._jobs = [
+            {"url": url, "status": "Queued", "node": None, "details": None, "row": None, "error": None}
+            for url in job_urls
+        ]
+        self._cancelled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._main_task: Optional[asyncio.Task] = None
+        self._thread = threading.Thread(target=self._thread_main, name="job-tracker-batch", daemon=True)
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """
+        Stop the batch: queued jobs won't start and running ones are interrupted
+        """
+        with self._lock:
+            self._cancelled = True
+            loop, task = self._loop, self._main_task
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        A copy of every job's progress, safe to read while the batch runs
+        """
+        with self._lock:
+            return [dict(job) for job in self._jobs]
+
+    def progress(self) -> float:
+        """
+        Share of the batch's work done, counting the nodes each running job has finished
+        """
+        jobs = self.snapshot()
+        if not jobs:
+            return 1.0
+        done = 0.0
+        for job in jobs:
+            if job["status"] not in ("Queued", "Running"):
+                done += 1
+            elif job["node"] in STEPS:
+                done += (STEPS.index(job["node"]) + 1) / len(STEPS)
+        return done / len(jobs)
+
+    def _update(self, index: int, **fields) -> None:
+        with self._lock:
+            self._jobs[index].update(fields)
+
+    def _thread_main(self) -> None:
+        try:
+            asyncio.run(self._run())
+        finally:
+            self.finished_at = time.time()
+
+    async def _run(self) -> None:
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._main_task = asyncio.current_task()
+            if self._cancelled:
+                return
+
+        sheets_buffer = SheetsWriteBuffer(
+            flush_rows=min(config.SHEETS_FLUSH_ROWS, self.max_concurrent),
+            append=get_tracker_sink().aappend_rows
+        )
+        run_config = {"configurable": {"sheets_buffer": sheets_buffer, "lean_state": self.lean_state}}
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def limited_job(index: int, url: str) -> None:
+            async with semaphore:
+                await self._run_job(index, url, run_config)
+
+        try:
+            await asyncio.gather(*[limited_job(i, job["url"]) for i, job in enumerate(self._jobs)])
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await sheets_buffer.flush()
+            await aclose_http_clients()
+            with self._lock:
+                for job in self._jobs:
+                    if job["status"] in ("Queued", "Running"):
+                        job["status"] = "Cancelled"
+
+    async def _run_job(self, index: int, url: str, run_config: dict) -> None:
+        self._update(index, status="Running")
+        state: Dict[str, Any] = {"job_url": url}
+        try:
+            async for update in job_tracker_app.astream(state, config=run_config, stream_mode="updates"):
+                for node, values in update.items():
+                    state.update(values or {})
+                    self._update(index, node=node)
+        except Exception as e:
+            self._update(index, status="Error", error=str(e))
+            return
+
+        if state.get('is_duplicate'):
+            self._update(index, status="Duplicate")
+        elif state.get('save_status') == 'success':
+            self._update(index, status="Success", details=state['final_details'], row=state.get('tracker_id'))
+        else:
+            self._update(index, status="Failed", error=state.get('error_message'))
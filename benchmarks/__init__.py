@@ -0,0 +1,3 @@
+"""
+Offline benchmarks of the job tracker nodes and graph
+"""
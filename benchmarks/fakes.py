@@ -0,0 +1,123 @@
+"""
+Offline stand-ins for the network: fixture pages, the chat model and the tracker sheet
+"""
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from utils.tokens import count_tokens
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixtures(directory: str = FIXTURES_DIR) -> List[Dict[str, str]]:
+    """
+    The recorded pages listed in the fixtures manifest: [{"file", "url", "html"}, ...]
+    """
+    with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    fixtures = []
+    for entry in manifest:
+        with open(os.path.join(directory, entry["file"]), encoding="utf-8") as f:
+            fixtures.append({**entry, "html": f.read()})
+    return fixtures
+
+
+def fixture_transport(fixtures: List[Dict[str, str]]) -> httpx.MockTransport:
+    """
+    HTTP transport answering fixture URLs with their recorded HTML (404 otherwise)
+    """
+    pages = {entry["url"]: entry["html"].encode("utf-8") for entry in fixtures}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = pages.get(str(request.url))
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    return httpx.MockTransport(handler)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model that answers extraction prompts like ChatOpenAI would
+
+    Returns a JSON object (or an array for batched prompts) with the fields
+    the system prompt asks for, and reports token usage, so everything
+    downstream of the LLM call runs as usual.
+    """
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-job-extractor"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        content = answer_prompt(messages[0].content, messages[-1].content)
+
+        input_tokens = sum(count_tokens(message.content) for message in messages)
+        output_tokens = count_tokens(content)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        return self._generate(messages, stop, **kwargs)
+
+
+def answer_prompt(system: str, user: str) -> str:
+    """
+    JSON reply to an extraction prompt: one object, or an array for a batch of postings
+    """
+    fields = re.findall(r"^\d+\. (\w+):", system, re.MULTILINE)
+    postings = re.split(r"^=== Posting \d+ ===$", user, flags=re.MULTILINE)[1:]
+    if postings:
+        return json.dumps([_answer(fields, text) for text in postings])
+    return json.dumps(_answer(fields, user))
+
+
+def _answer(fields: List[str], posting: str) -> Dict[str, Any]:
+    lines = [line.strip() for line in posting.splitlines() if line.strip() and not line.startswith("Job Posting Content")]
+    years = re.search(r"(\d+)\+? years", posting)
+    answer = {}
+    for field in fields:
+        if field == "job_title":
+            answer[field] = lines[0] if lines else "Not mentioned"
+        elif field == "skills_required":
+            answer[field] = re.findall(r"experience with (\w+)", posting)[:7]
+        elif field == "experience_required" and years:
+            answer[field] = f"{years.group(1)}+ years"
+        else:
+            answer[field] = "Not mentioned"
+    return answer
+
+
+class FakeWorksheet:
+    """
+    In-memory stand-in for the gspread tracker worksheet
+    """
+
+    def __init__(self, header: Optional[List[str]] = None):
+        self.rows: List[List[Any]] = [header or ["Job Title"]]
+        self.calls = 0
+
+    def append_rows(self, rows: List[List[Any]], **kwargs) -> Dict[str, Any]:
+        self.calls += 1
+        start = len(self.rows) + 1
+        self.rows.extend(rows)
+        return {"updates": {"updatedRange": f"Sheet1!A{start}:M{len(self.rows)}"}}
+
+    def col_values(self, col: int) -> List[Any]:
+        return [row[col - 1] if len(row) >= col else "" for row in self.rows]
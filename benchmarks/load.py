@@ -0,0 +1,331 @@
+"""
+Load and soak test of run_batch_parallel against local stand-in servers
+
+Starts stand-ins for the job site, the OpenAI chat API and the Google
+Sheets API (see benchmarks/standins.py), points the app at them and runs
+the real graph over thousands of generated job URLs. While the batches
+run, throughput, job latency, RSS, threads, open file descriptors and
+sockets of this process are sampled from /proc, so leaks and scaling
+cliffs show up as trends over time.
+
+Usage:
+    python -m benchmarks.load --urls 5000 --max-concurrent 50 --output load.json
+    python -m benchmarks.load --urls 2000 --batches 10 --llm-429-rate 0.05   # soak
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from benchmarks.standins import ROLES, Behaviour, StandIn, write_fake_credentials
+
+# The app modules are imported in run_load(), once configure_environment()
+# has pointed them at the stand-ins
+
+
+def process_stats() -> Dict[str, Optional[float]]:
+    """
+    RSS, thread count, open file descriptors and sockets of this process (Linux /proc)
+    """
+    stats = {"rss_mib": None, "threads": threading.active_count(), "fds": None, "sockets": None}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    stats["rss_mib"] = int(line.split()[1]) / 1024
+                elif line.startswith("Threads:"):
+                    stats["threads"] = int(line.split()[1])
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return stats
+
+    sockets = 0
+    for fd in fds:
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                sockets += 1
+        except OSError:
+            pass  # Closed since the listing
+    stats["fds"] = len(fds)
+    stats["sockets"] = sockets
+    return stats
+
+
+class Sampler(threading.Thread):
+    """
+    Background thread recording job results as they finish and a resource
+    sample every interval seconds
+    """
+
+    def __init__(self, total: int, interval: float):
+        super().__init__(daemon=True)
+        self.total = total
+        self.interval = interval
+        self.samples: List[Dict[str, Any]] = []
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._began = time.perf_counter()
+        self._last = (self._began, 0)
+        self._window: List[float] = []
+        # Batches run with stdout redirected to their log; progress goes to the console
+        self._out = sys.stdout
+
+    def on_result(self, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self.statuses[result["status"]] += 1
+            if not result.get("coalesced"):
+                self.latencies.append(result["seconds"])
+                self._window.append(result["seconds"])
+
+    def run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.join()
+
+    def sample(self, label: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record throughput and latency since the previous sample, plus process resources
+        """
+        now = time.perf_counter()
+        with self._lock:
+            completed = sum(self.statuses.values())
+            window, self._window = sorted(self._window), []
+        last_time, last_completed = self._last
+        self._last = (now, completed)
+
+        sample = {
+            "t": now - self._began,
+            "completed": completed,
+            "jobs_per_second": (completed - last_completed) / (now - last_time) if now > last_time else 0.0,
+            "p50": _percentile(window, 0.5),
+            "p95": _percentile(window, 0.95),
+            "p99": _percentile(window, 0.99),
+            **process_stats(),
+        }
+        if label:
+            sample["label"] = label
+        self.samples.append(sample)
+        print(
+            f"[{sample['t']:7.1f}s] {completed}/{self.total} jobs, {sample['jobs_per_second']:.1f} jobs/s, "
+            f"p95 {sample['p95']:.2f}s, RSS {_format(sample['rss_mib'], '.0f')} MiB, "
+            f"{sample['threads']} threads, {_format(sample['sockets'])} sockets"
+            + (f" ({label})" if label else ""),
+            file=self._out, flush=True
+        )
+        return sample
+
+
+def _percentile(samples: List[float], quantile: float) -> float:
+    """
+    Nearest-rank percentile of sorted samples (as in utils.metrics)
+    """
+    if not samples:
+        return 0.0
+    return samples[max(0, min(len(samples) - 1, math.ceil(quantile * len(samples)) - 1))]
+
+
+def _format(value: Optional[float], spec: str = "") -> str:
+    return "n/a" if value is None else format(value, spec)
+
+
+def configure_environment(standins: Dict[str, StandIn], workdir: str, rate_limit: bool, sink: str = "sheets") -> None:
+    """
+    Point the app at the stand-ins and keep all of its local state in workdir
+
+    Must run before the app modules are imported, since config reads the
+    environment at import time.
+    """
+    credentials_file = os.path.join(workdir, "credentials.json")
+    write_fake_credentials(credentials_file, f"{standins['sheets'].url}/token")
+    os.environ.update({
+        "OPENAI_BASE_URL": f"{standins['chat'].url}/v1",
+        "OPENAI_API_KEY": "sk-load-test",
+        "SHEETS_API_BASE": f"{standins['sheets'].url}/v4/spreadsheets",
+        "SHEET_ID": "load-test",
+        "GOOGLE_CREDENTIALS_FILE": credentials_file,
+        # Seeding the URL index reads the sheet through gspread, which
+        # always talks to the real Google API
+        "URL_INDEX_ENABLED": "0",
+        "RATE_LIMIT_ENABLED": "1" if rate_limit else "0",
+        "HTTP_CACHE_PATH": os.path.join(workdir, "http_cache.sqlite3"),
+        "EXTRACTION_CACHE_PATH": os.path.join(workdir, "extraction_cache.sqlite3"),
+        "CHECKPOINT_PATH": os.path.join(workdir, "checkpoints.sqlite3"),
+        "RATE_LIMIT_PATH": os.path.join(workdir, "rate_limits.sqlite3"),
+        "BLOB_DIR": os.path.join(workdir, "blobs"),
+        "TRACKER_SINK": sink,
+        "TRACKER_DB_PATH": os.path.join(workdir, "tracker.sqlite3"),
+    })
+
+
+def run_load(args: argparse.Namespace, site_url: str) -> Dict[str, Any]:
+    """
+    Run the batches one after another in this process, sampling throughout
+    """
+    from main import run_batch_parallel
+    from utils.metrics import get_metrics
+    from utils.tracker_sink import MirroredSink, get_tracker_sink, tracker_status
+
+    sampler = Sampler(args.urls * args.batches, args.sample_interval)
+    sampler.sample("start")
+    sampler.start()
+
+    batches = []
+    log = open(args.log or os.devnull, "a", encoding="utf-8")
+    try:
+        for batch in range(args.batches):
+            job_urls = [f"{site_url}/jobs/{batch}-{i}" for i in range(args.urls)]
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(log):
+                results = asyncio.run(run_batch_parallel(
+                    job_urls,
+                    max_concurrent=args.max_concurrent,
+                    extract_batch_size=args.extract_batch_size,
+                    lean_state=args.lean_state,
+                    batch_id=f"load-{batch}" if args.checkpoint else None,
+                    on_result=sampler.on_result
+                ))
+            elapsed = time.perf_counter() - started
+            batches.append({
+                "jobs": len(results),
+                "seconds": elapsed,
+                "jobs_per_second": len(results) / elapsed,
+                "statuses": dict(Counter(result["status"] for result in results)),
+                "nodes": get_metrics().summary()["nodes"],
+            })
+            sampler.sample(f"batch {batch + 1} done")
+        sink = get_tracker_sink()
+        if isinstance(sink, MirroredSink):
+            # Push the rows the background sync hasn't reached yet while the stand-ins still run
+            with contextlib.redirect_stdout(log):
+                sink.sync_all()
+    finally:
+        sampler.stop()
+        log.close()
+
+    latencies = sorted(sampler.latencies)
+    return {
+        "batches": batches,
+        "latency": {
+            "jobs": len(latencies),
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0.0,
+        },
+        "samples": sampler.samples,
+        "node_report": get_metrics().report(),
+        "tracker": tracker_status(sink),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n" + "=" * 70)
+    print("LOAD TEST SUMMARY")
+    print("=" * 70)
+    for i, batch in enumerate(report["batches"], start=1):
+        statuses = ", ".join(f"{status} {count}" for status, count in sorted(batch["statuses"].items()))
+        print(f"Batch {i}: {batch['jobs']} jobs in {batch['seconds']:.1f}s, "
+              f"{batch['jobs_per_second']:.1f} jobs/s ({statuses})")
+
+    latency = report["latency"]
+    print(f"\nJob latency: p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s, "
+          f"p99 {latency['p99']:.2f}s, max {latency['max']:.2f}s")
+
+    samples = report["samples"]
+    rss = [s["rss_mib"] for s in samples if s["rss_mib"] is not None]
+    if rss:
+        after_batches = [s["rss_mib"] for s in samples if s.get("label", "").endswith("done")]
+        print(f"RSS: {rss[0]:.0f} MiB at start, {max(rss):.0f} MiB peak, "
+              f"after each batch: {', '.join(f'{value:.0f}' for value in after_batches)} MiB")
+    print(f"Threads: {max(s['threads'] for s in samples)} peak, {samples[-1]['threads']} at the end")
+    sockets = [s["sockets"] for s in samples if s["sockets"] is not None]
+    if sockets:
+        print(f"Sockets: {max(sockets)} peak, {sockets[-1]} at the end")
+
+    tracker = report["tracker"]
+    print(f"Tracker: {tracker['sink']}" + (f", {tracker['rows']} rows" if "rows" in tracker else "")
+          + (f", {tracker['unsynced']} not synced" if tracker.get("unsynced") else ""))
+
+    print("\nStand-ins:")
+    for role, stats in report["standins"].items():
+        print(f"  {role:<7} {stats['requests']} requests, {stats['errors']} errors, {stats['throttled']} throttled")
+
+    if report["node_report"]:
+        print("\nNodes (last batch):")
+        for line in report["node_report"]:
+            print(f"  {line}")
+    print("=" * 70)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load and soak test of the job tracker against local stand-in servers")
+    parser.add_argument("--urls", type=int, default=1000, help="Job URLs per batch")
+    parser.add_argument("--batches", type=int, default=1, help="Batches run one after another in the same process")
+    parser.add_argument("--max-concurrent", type=int, default=20)
+    parser.add_argument("--extract-batch-size", type=int, default=0)
+    parser.add_argument("--lean-state", action="store_true")
+    parser.add_argument("--checkpoint", action="store_true", help="Checkpoint every job, like main.py does by default")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep the shared OpenAI rate limiter on")
+    parser.add_argument("--sink", choices=("sheets", "local", "mirror"), default="sheets", help="Tracker sink to save to")
+    for role, latency in (("site", 0.2), ("llm", 0.5), ("sheets", 0.1)):
+        parser.add_argument(f"--{role}-latency", type=float, default=latency, help="Mean response delay in seconds")
+        parser.add_argument(f"--{role}-error-rate", type=float, default=0.0, help="Share of 503 responses")
+        parser.add_argument(f"--{role}-429-rate", type=float, default=0.0, help="Share of 429 responses")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between resource samples")
+    parser.add_argument("--log", help="Append the batches' own output to this file (default: discarded)")
+    parser.add_argument("--workdir", help="Directory for caches, checkpoints and credentials (default: a new temp dir)")
+    parser.add_argument("--output", help="Write the full report, including the samples, as JSON to this file")
+    args = parser.parse_args()
+    if args.urls < 1 or args.batches < 1:
+        parser.error("--urls and --batches must be at least 1")
+    return args
+
+
+def behaviour(args: argparse.Namespace, option: str) -> Behaviour:
+    values = vars(args)
+    return Behaviour(
+        latency=values[f"{option}_latency"],
+        error_rate=values[f"{option}_error_rate"],
+        throttle_rate=values[f"{option}_429_rate"]
+    )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    workdir = args.workdir or tempfile.mkdtemp(prefix="job-tracker-load-")
+    os.makedirs(workdir, exist_ok=True)
+
+    options = {"site": "site", "chat": "llm", "sheets": "sheets"}
+    standins = {role: StandIn(role, behaviour(args, options[role])) for role in ROLES}
+    try:
+        for standin in standins.values():
+            standin.start()
+        configure_environment(standins, workdir, args.rate_limit, args.sink)
+        print(f"Stand-ins: {', '.join(f'{role} {standin.url}' for role, standin in standins.items())}")
+        print(f"Working directory: {workdir}\n")
+
+        report = run_load(args, standins["site"].url)
+        report["standins"] = {role: standin.stats() for role, standin in standins.items()}
+    finally:
+        for standin in standins.values():
+            standin.stop()
+
+    report["meta"] = {"python": platform.python_version(), "platform": platform.platform(), "args": vars(args)}
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
@@ -0,0 +1,40 @@
+"""
+Record a live job page as a benchmark fixture
+
+Usage:
+    python -m benchmarks.record https://www.linkedin.com/jobs/view/123 linkedin_4
+"""
+import argparse
+import json
+import os
+from benchmarks.fakes import FIXTURES_DIR
+from utils.http_client import get_http_client
+
+
+def record_fixture(url: str, name: str, directory: str = FIXTURES_DIR) -> str:
+    """
+    Save the full page body as <name>.html and list it in the manifest
+    """
+    response = get_http_client(url).get(url)
+    response.raise_for_status()
+
+    file_name = f"{name}.html"
+    with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+        f.write(response.text)
+
+    manifest_path = os.path.join(directory, "manifest.json")
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = [entry for entry in json.load(f) if entry["file"] != file_name]
+    manifest.append({"file": file_name, "url": url})
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(sorted(manifest, key=lambda entry: entry["file"]), f, indent=2)
+        f.write("\n")
+    return file_name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a job page as a benchmark fixture")
+    parser.add_argument("url", help="Job posting URL")
+    parser.add_argument("name", help="Fixture name, e.g. linkedin_4")
+    args = parser.parse_args()
+    print(f"Recorded {record_fixture(args.url, args.name)} ({args.url})")
@@ -0,0 +1,293 @@
+"""
+Offline benchmark of every graph node and of the whole graph
+
+Runs the nodes over the recorded pages in benchmarks/fixtures, with the
+job sites, the LLM and Google Sheets replaced by in-process fakes, so
+the numbers only measure our own code and are comparable between
+commits on the same machine.
+
+Usage:
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --compare bench.json
+"""
+import os
+
+# Caches, the URL index and the rate limiter would turn repeated runs into
+# cache hits, so every layer is switched off before the app modules load
+os.environ.update({
+    "HTTP_CACHE_ENABLED": "0",
+    "EXTRACTION_CACHE_ENABLED": "0",
+    "URL_INDEX_ENABLED": "0",
+    "RATE_LIMIT_ENABLED": "0",
+    "METRICS_ENABLED": "0",
+    "LEAN_STATE": "0",
+    "TRACKER_SINK": "sheets",
+})
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("SHEET_ID", "benchmark")
+
+import argparse
+import contextlib
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
+import nodes.extract
+import utils.sheets_client
+from benchmarks.fakes import FakeChatModel, FakeWorksheet, fixture_transport, load_fixtures
+from graph import job_tracker_app
+from nodes import fetch_job_page, parse_content, extract_details, prepare_tracker_entry, save_to_tracker
+from utils.content_cleaner import clean_content_by_site
+from utils.html_text import html_to_text
+from utils.http_client import _clients, _client_options
+
+# Slowdown (as a fraction) reported as a regression by --compare
+DEFAULT_THRESHOLD = 0.10
+
+
+def install_fakes(fixtures: List[Dict[str, str]]) -> FakeWorksheet:
+    """
+    Route page fetches, LLM calls and Sheets appends to the offline fakes
+    """
+    transport = fixture_transport(fixtures)
+    for host in {urlsplit(entry["url"]).hostname for entry in fixtures}:
+        options = _client_options(host)
+        options.pop("http2")
+        _clients[host] = httpx.Client(transport=transport, **options)
+
+    nodes.extract._llm = FakeChatModel()
+    worksheet = FakeWorksheet()
+    utils.sheets_client.get_worksheet = lambda: worksheet
+    return worksheet
+
+
+def node_inputs(fixtures: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Run each fixture through the graph once, keeping the state every node starts from
+    """
+    inputs = []
+    for entry in fixtures:
+        state = {"job_url": entry["url"]}
+        states = {"fetch": dict(state)}
+        for name, node in (("parse", fetch_job_page), ("extract", parse_content),
+                           ("prepare", extract_details), ("save", prepare_tracker_entry)):
+            state.update(node(state))
+            if state.get("error_message"):
+                raise RuntimeError(f"{entry['file']}: {state['error_message']}")
+            states[name] = dict(state)
+        states["clean"] = html_to_text(state["raw_html"])
+        inputs.append({"file": entry["file"], "url": entry["url"], "states": states})
+    return inputs
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int) -> Dict[str, float]:
+    """
+    Time a call iterations times (after warmup calls), then trace its peak memory once
+
+    Memory is traced in a separate call because tracemalloc slows the code down.
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return _stats(timings, peak)
+
+
+def _stats(timings: List[float], peak: int) -> Dict[str, float]:
+    timings = sorted(timings)
+    return {
+        "calls": len(timings),
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "min_ms": timings[0] * 1000,
+        "p95_ms": timings[max(0, round(0.95 * len(timings)) - 1)] * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def benchmark_nodes(inputs: List[Dict[str, Any]], iterations: int, warmup: int) -> Dict[str, Any]:
+    """
+    Per-node time and memory per call, for each fixture and over all of them
+    """
+    benchmarks = {
+        "fetch": lambda case: fetch_job_page(case["states"]["fetch"]),
+        "parse": lambda case: parse_content(case["states"]["parse"]),
+        "clean": lambda case: clean_content_by_site(case["states"]["clean"], case["url"]),
+        "extract": lambda case: extract_details(case["states"]["extract"]),
+        "prepare": lambda case: prepare_tracker_entry(case["states"]["prepare"]),
+        "save": lambda case: save_to_tracker(case["states"]["save"]),
+    }
+    results = {}
+    for name, run in benchmarks.items():
+        per_fixture = {
+            case["file"]: measure(lambda: run(case), iterations, warmup)
+            for case in inputs
+        }
+        results[name] = {
+            "all": _combine(list(per_fixture.values())),
+            "fixtures": per_fixture,
+        }
+    return results
+
+
+def _combine(stats: List[Dict[str, float]]) -> Dict[str, float]:
+    """
+    Totals over fixtures: averages of the per-call times, the largest peak
+    """
+    return {
+        "calls": sum(s["calls"] for s in stats),
+        "mean_ms": statistics.fmean(s["mean_ms"] for s in stats),
+        "median_ms": statistics.fmean(s["median_ms"] for s in stats),
+        "min_ms": min(s["min_ms"] for s in stats),
+        "p95_ms": max(s["p95_ms"] for s in stats),
+        "peak_kib": max(s["peak_kib"] for s in stats),
+    }
+
+
+def benchmark_graph(fixtures: List[Dict[str, str]], rounds: int) -> Dict[str, float]:
+    """
+    Whole-graph throughput: every fixture through job_tracker_app, rounds times
+    """
+    started = time.perf_counter()
+    jobs = 0
+    for _ in range(rounds):
+        for entry in fixtures:
+            final_state = job_tracker_app.invoke({"job_url": entry["url"]})
+            if final_state.get("error_message"):
+                raise RuntimeError(f"{entry['file']}: {final_state['error_message']}")
+            jobs += 1
+    elapsed = time.perf_counter() - started
+    return {"jobs": jobs, "seconds": elapsed, "jobs_per_second": jobs / elapsed}
+
+
+def run(iterations: int, warmup: int, rounds: int) -> Dict[str, Any]:
+    fixtures = load_fixtures()
+    worksheet = install_fakes(fixtures)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        inputs = node_inputs(fixtures)
+        node_results = benchmark_nodes(inputs, iterations, warmup)
+        graph_results = benchmark_graph(fixtures, rounds)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "fixtures": len(fixtures),
+            "iterations": iterations,
+            "rounds": rounds,
+            "llm_calls": nodes.extract._llm.calls,
+            "sheet_rows": len(worksheet.rows) - 1,
+        },
+        "nodes": node_results,
+        "graph": graph_results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Lines describing every node (median time) and the graph (jobs/sec) that
+    got slower than the baseline by more than threshold
+    """
+    regressions = []
+    for name, node in results["nodes"].items():
+        before = baseline.get("nodes", {}).get(name, {}).get("all", {}).get("median_ms")
+        after = node["all"]["median_ms"]
+        if before and after > before * (1 + threshold):
+            regressions.append(f"{name}: {before:.3f} ms -> {after:.3f} ms (+{(after / before - 1) * 100:.0f}%)")
+
+    before = baseline.get("graph", {}).get("jobs_per_second")
+    after = results["graph"]["jobs_per_second"]
+    if before and after < before * (1 - threshold):
+        regressions.append(f"graph: {before:.1f} -> {after:.1f} jobs/sec ({(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    meta = results["meta"]
+    print(f"Benchmark of {meta['commit'] or 'working tree'} on Python {meta['python']} "
+          f"({meta['fixtures']} fixtures, {meta['iterations']} calls each)")
+    print(f"{'node':<8} {'median':>10} {'mean':>10} {'p95':>10} {'peak':>11}" + ("   baseline" if baseline else ""))
+    for name, node in results["nodes"].items():
+        stats = node["all"]
+        line = (f"{name:<8} {stats['median_ms']:>8.3f}ms {stats['mean_ms']:>8.3f}ms "
+                f"{stats['p95_ms']:>8.3f}ms {stats['peak_kib']:>7.0f} KiB")
+        before = (baseline or {}).get("nodes", {}).get(name, {}).get("all", {}).get("median_ms")
+        if before:
+            line += f"   {before:.3f}ms ({(stats['median_ms'] / before - 1) * 100:+.0f}%)"
+        print(line)
+
+    graph = results["graph"]
+    line = f"graph    {graph['jobs_per_second']:.1f} jobs/sec ({graph['jobs']} jobs in {graph['seconds']:.2f}s)"
+    before = (baseline or {}).get("graph", {}).get("jobs_per_second")
+    if before:
+        line += f", baseline {before:.1f} ({(graph['jobs_per_second'] / before - 1) * 100:+.0f}%)"
+    print(line)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the job tracker nodes and graph")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed calls per node and fixture")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed calls before timing")
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the fixtures for the whole-graph run")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown reported as a regression (default: 0.10 = 10%%)")
+    args = parser.parse_args()
+    if args.iterations < 1 or args.rounds < 1:
+        parser.error("--iterations and --rounds must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run(args.iterations, args.warmup, args.rounds)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions (more than {args.threshold:.0%} slower than {args.compare}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions")
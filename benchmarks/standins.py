@@ -0,0 +1,204 @@
+"""
+Local stand-ins for the job site, the OpenAI chat API and the Google Sheets API
+
+Each stand-in is a small HTTP/1.1 keep-alive server running in its own
+process (so its threads and sockets don't show up in the measurements of
+the process under test), with configurable latency and error/429 rates.
+GET /_stats on any of them returns its request counters.
+"""
+import json
+import multiprocessing
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+import rsa
+
+ROLES = ("site", "chat", "sheets")
+
+
+@dataclass
+class Behaviour:
+    """
+    How a stand-in answers: latency is the mean delay in seconds (spread
+    uniformly between half and one and a half times it), error_rate the
+    share of 503 responses and throttle_rate the share of 429 responses
+    """
+    latency: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+
+    def do_GET(self):
+        if self.path == "/_stats":
+            with self.server.lock:
+                return self._send_json(200, dict(self.server.stats))
+        if self.server.role != "site" or not self.path.startswith("/jobs/"):
+            return self._send(404, b"")
+        if self._misbehave():
+            return
+
+        job_id = self.path.split("/")[2]
+        pages = self.server.pages
+        page = pages[zlib.crc32(job_id.encode()) % len(pages)]
+        # Every job ID gets its own text, like distinct postings would
+        body = page.replace("<body>", f"<body><p>Job reference {job_id}</p>", 1).encode("utf-8")
+        self._send(200, body, "text/html; charset=utf-8")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        role = self.server.role
+        if role == "sheets" and self.path.startswith("/token"):
+            return self._send_json(200, {"access_token": "load-test-token", "expires_in": 3600, "token_type": "Bearer"})
+        if self._misbehave():
+            return
+
+        request = json.loads(body or b"{}")
+
+        path = urlsplit(self.path).path
+        if role == "chat" and path.endswith("/chat/completions"):
+            self._send_json(200, self._completion(request))
+        elif role == "sheets" and path.endswith(":append"):
+            rows = len(request.get("values", []))
+            with self.server.lock:
+                start = self.server.stats["rows"] + 2  # Row 1 is the header
+                self.server.stats["rows"] += rows
+            self._send_json(200, {"updates": {"updatedRange": f"Sheet1!A{start}:M{start + rows - 1}"}})
+        else:
+            self._send(404, b"")
+
+    def _misbehave(self) -> bool:
+        """
+        Count the request, wait out the latency and maybe answer with an error instead
+        """
+        behaviour: Behaviour = self.server.behaviour
+        if behaviour.latency:
+            time.sleep(behaviour.latency * random.uniform(0.5, 1.5))
+        roll = random.random()
+        with self.server.lock:
+            self.server.stats["requests"] += 1
+            if roll < behaviour.throttle_rate:
+                self.server.stats["throttled"] += 1
+            elif roll < behaviour.throttle_rate + behaviour.error_rate:
+                self.server.stats["errors"] += 1
+        if roll < behaviour.throttle_rate:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                            {"Retry-After": "1", "retry-after-ms": "200"})
+            return True
+        if roll < behaviour.throttle_rate + behaviour.error_rate:
+            self._send_json(503, {"error": {"message": "Service unavailable", "type": "server_error"}})
+            return True
+        return False
+
+    def _completion(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        messages = request.get("messages", [])
+        content = self.server.answer_prompt(messages[0]["content"], messages[-1]["content"])
+        prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-{random.getrandbits(64):016x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/plain", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(role: str, behaviour: Dict[str, float], ready) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    server.role = role
+    server.behaviour = Behaviour(**behaviour)
+    server.lock = threading.Lock()
+    server.stats = {"requests": 0, "errors": 0, "throttled": 0, "rows": 0}
+    # Imported here, in the child: benchmarks.fakes loads the app's config,
+    # which the harness only does once the stand-ins' URLs are in the environment
+    from benchmarks.fakes import answer_prompt, load_fixtures
+    server.answer_prompt = answer_prompt
+    if role == "site":
+        server.pages = [entry["html"] for entry in load_fixtures()]
+    ready.send(server.server_address[1])
+    server.serve_forever()
+
+
+class StandIn:
+    """
+    One stand-in server in a child process; url is its base URL once started
+    """
+
+    def __init__(self, role: str, behaviour: Behaviour):
+        if role not in ROLES:
+            raise ValueError(f"Unknown stand-in role: {role}")
+        self.role = role
+        self.behaviour = behaviour
+        self.url: Optional[str] = None
+        self._process = None
+
+    def start(self) -> str:
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_serve, args=(self.role, asdict(self.behaviour), sender), daemon=True
+        )
+        self._process.start()
+        if not receiver.poll(30):
+            self.stop()
+            raise RuntimeError(f"The {self.role} stand-in did not start")
+        self.url = f"http://127.0.0.1:{receiver.recv()}"
+        return self.url
+
+    def stats(self) -> Dict[str, int]:
+        return httpx.get(f"{self.url}/_stats").json()
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+
+def write_fake_credentials(path: str, token_uri: str) -> None:
+    """
+    Service account file with a throwaway key whose tokens come from token_uri
+    """
+    _, private_key = rsa.newkeys(1024)
+    credentials = {
+        "type": "service_account",
+        "project_id": "load-test",
+        "private_key_id": "load-test",
+        "private_key": private_key.save_pkcs1().decode("ascii"),
+        "client_email": "load-test@load-test.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": token_uri,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(credentials, f)
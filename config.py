@@ -0,0 +1,151 @@
+"""
+Runtime settings - read once from environment variables (or .env)
+
+Every setting has a default that matches the original behaviour, so the
+app runs without any of these being set.
+"""
+import os
+from typing import Dict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_mapping(name: str) -> Dict[str, int]:
+    """
+    Parse "linkedin.com=20,indeed.com=10" into {"linkedin.com": 20, "indeed.com": 10}
+    """
+    mapping = {}
+    for item in os.getenv(name, "").split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            mapping[key.strip().lower()] = int(value)
+    return mapping
+
+
+def runtime_option(name: str, default=None):
+    """
+    Read a per-run option passed as config={"configurable": {...}} to the graph
+
+    Falls back to the default when called outside a graph run or when the
+    option was not given.
+    """
+    from langgraph.config import get_config
+    try:
+        value = get_config().get("configurable", {}).get(name)
+    except RuntimeError:
+        return default
+    return default if value is None else value
+
+
+# HTTP client (used by the fetch node)
+HTTP_CONNECT_TIMEOUT = _env_float("HTTP_CONNECT_TIMEOUT", 5.0)
+HTTP_READ_TIMEOUT = _env_float("HTTP_READ_TIMEOUT", 10.0)
+HTTP_POOL_SIZE = _env_int("HTTP_POOL_SIZE", 10)  # Connections per host
+HTTP_HOST_POOL_SIZES = _env_mapping("HTTP_HOST_POOL_SIZES")  # Per-host overrides
+HTTP_KEEPALIVE_EXPIRY = _env_float("HTTP_KEEPALIVE_EXPIRY", 30.0)
+HTTP2 = _env_bool("HTTP2", False)  # Needs the optional "h2" package
+
+# HTTP response cache for job pages
+HTTP_CACHE_ENABLED = _env_bool("HTTP_CACHE_ENABLED", True)
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", ".cache/http_cache.sqlite3")
+HTTP_CACHE_TTL = _env_float("HTTP_CACHE_TTL", 3600.0)  # Seconds before revalidating
+HTTP_CACHE_MAX_MB = _env_int("HTTP_CACHE_MAX_MB", 256)
+
+# LLM extraction
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Cheaper and faster model
+EXTRACT_TOKEN_BUDGET = _env_int("EXTRACT_TOKEN_BUDGET", 2000)  # Tokens of posting text sent to the LLM
+EXTRACTION_CACHE_ENABLED = _env_bool("EXTRACTION_CACHE_ENABLED", True)
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", ".cache/extraction_cache.sqlite3")
+EXTRACTION_CACHE_MAX_ENTRIES = _env_int("EXTRACTION_CACHE_MAX_ENTRIES", 50000)
+EXTRACTION_CACHE_TTL_DAYS = _env_float("EXTRACTION_CACHE_TTL_DAYS", 30.0)
+
+# Google Sheets tracker
+GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_CREDENTIALS_FILE", "credentials.json")
+SHEETS_API_BASE = os.getenv("SHEETS_API_BASE", "https://sheets.googleapis.com/v4/spreadsheets")
+SHEETS_FLUSH_ROWS = _env_int("SHEETS_FLUSH_ROWS", 20)  # Flush the write buffer at this many rows
+SHEETS_FLUSH_INTERVAL = _env_float("SHEETS_FLUSH_INTERVAL", 2.0)  # ...or after this many seconds
+
+# Index of job URLs already in the tracker (duplicate skipping)
+URL_INDEX_ENABLED = _env_bool("URL_INDEX_ENABLED", True)
+URL_INDEX_PATH = os.getenv("URL_INDEX_PATH", ".cache/url_index.sqlite3")
+
+# HTML parsing: "fast" (streaming lxml, no tree) or "soup" (BeautifulSoup)
+PARSER_MODE = os.getenv("PARSER_MODE", "fast").strip().lower()
+
+# Page download limits
+FETCH_MAX_BYTES = _env_int("FETCH_MAX_BYTES", 2 * 1024 * 1024)  # Stop reading a page after this many bytes
+FETCH_EARLY_STOP = _env_bool("FETCH_EARLY_STOP", True)  # Stop at the site's "Similar jobs"-style markers
+
+# Lean graph state: raw HTML and parsed text live in a spill directory, state holds references
+LEAN_STATE = _env_bool("LEAN_STATE", False)
+BLOB_DIR = os.getenv("BLOB_DIR", "")  # Defaults to <system temp>/job-tracker-blobs
+
+# Checkpointed batch runs: graph state is saved after every node so a batch can be resumed
+CHECKPOINT_ENABLED = _env_bool("CHECKPOINT_ENABLED", True)  # Used by the command-line batch runner
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite3")
+
+# Retries for transient errors (HTTP 429/5xx, network errors, OpenAI rate limits, Sheets quota)
+RETRY_MAX_ATTEMPTS = _env_int("RETRY_MAX_ATTEMPTS", 3)  # Attempts per node, including the first
+RETRY_INITIAL_INTERVAL = _env_float("RETRY_INITIAL_INTERVAL", 1.0)  # Seconds before the first retry, doubled after each
+RETRY_MAX_INTERVAL = _env_float("RETRY_MAX_INTERVAL", 30.0)
+
+# Per-host circuit breakers: stop requesting from a host that keeps failing or blocking us
+CIRCUIT_FAILURE_THRESHOLD = _env_int("CIRCUIT_FAILURE_THRESHOLD", 5)  # Failures in a row before the circuit opens
+CIRCUIT_COOLDOWN = _env_float("CIRCUIT_COOLDOWN", 60.0)  # Seconds before a trial request is let through
+
+# Pipelined batch runs (main.py --pipelined): workers per stage and the queue between stages
+PIPELINE_FETCH_WORKERS = _env_int("PIPELINE_FETCH_WORKERS", 10)
+PIPELINE_PARSE_WORKERS = _env_int("PIPELINE_PARSE_WORKERS", 2)
+PIPELINE_EXTRACT_WORKERS = _env_int("PIPELINE_EXTRACT_WORKERS", 5)
+PIPELINE_SAVE_WORKERS = _env_int("PIPELINE_SAVE_WORKERS", 10)
+PIPELINE_QUEUE_SIZE = _env_int("PIPELINE_QUEUE_SIZE", 20)  # Jobs waiting between two stages
+
+# OpenAI rate limits, shared by all jobs and worker processes (0 = no limit)
+RATE_LIMIT_ENABLED = _env_bool("RATE_LIMIT_ENABLED", True)
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_PATH", ".cache/rate_limits.sqlite3")
+OPENAI_RPM_LIMIT = _env_int("OPENAI_RPM_LIMIT", 500)  # Requests per minute (gpt-4o-mini, usage tier 1)
+OPENAI_TPM_LIMIT = _env_int("OPENAI_TPM_LIMIT", 200000)  # Tokens per minute (gpt-4o-mini, usage tier 1)
+OPENAI_RPM_LIMITS = _env_mapping("OPENAI_RPM_LIMITS")  # Per-model overrides, e.g. "gpt-4o=5000"
+OPENAI_TPM_LIMITS = _env_mapping("OPENAI_TPM_LIMITS")
+RATE_LIMIT_HEADROOM = _env_float("RATE_LIMIT_HEADROOM", 0.9)  # Use this share of the limits
+
+# Per-node timing spans and latency percentiles (see utils/metrics.py)
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+METRICS_MAX_SAMPLES = _env_int("METRICS_MAX_SAMPLES", 10000)  # Latest durations kept per node and site
+
+# Durable job queue for multi-process workers (see worker.py)
+QUEUE_PATH = os.getenv("QUEUE_PATH", ".cache/job_queue.sqlite3")
+QUEUE_WAL = _env_bool("QUEUE_WAL", True)  # Turn off when the queue file is shared between machines (NFS etc.)
+QUEUE_VISIBILITY_TIMEOUT = _env_float("QUEUE_VISIBILITY_TIMEOUT", 300.0)  # Seconds before a silent worker's job is handed out again
+QUEUE_MAX_ATTEMPTS = _env_int("QUEUE_MAX_ATTEMPTS", 3)  # Claims per job before it is marked failed
+QUEUE_POLL_INTERVAL = _env_float("QUEUE_POLL_INTERVAL", 2.0)  # Seconds between checks of an empty queue
+
+# Where saved jobs go (see utils/tracker_sink.py): "sheets", "local" or "mirror" (local, copied to Sheets in the background)
+TRACKER_SINK = os.getenv("TRACKER_SINK", "sheets").strip().lower()
+TRACKER_DB_PATH = os.getenv("TRACKER_DB_PATH", ".cache/tracker.sqlite3")
+TRACKER_SYNC_INTERVAL = _env_float("TRACKER_SYNC_INTERVAL", 10.0)  # Seconds between mirror syncs to Sheets
+TRACKER_SYNC_BATCH = _env_int("TRACKER_SYNC_BATCH", 500)  # Rows per Sheets append when syncing
+
+# Refreshing postings that are already in the tracker (see refresh.py)
+REFRESH_DB_PATH = os.getenv("REFRESH_DB_PATH", ".cache/refresh.sqlite3")
+REFRESH_INTERVAL = _env_float("REFRESH_INTERVAL", 86400.0)  # Seconds before a posting is checked again
+REFRESH_MAX_CONCURRENT = _env_int("REFRESH_MAX_CONCURRENT", 10)  # Postings checked at the same time
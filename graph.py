@@ -1,40 +1,88 @@
 from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
 from state import JobTrackerState
+from utils.resilience import retry_policy
 from nodes import (
+    check_duplicate,
     fetch_job_page,
+    afetch_job_page,
     parse_content,
     extract_details,
+    aextract_details,
     prepare_tracker_entry,
-    save_to_tracker
+    save_to_tracker,
+    asave_to_tracker,
+    handle_failure
 )
 
-def create_job_tracker_graph():
+# Steps of the flow, in order
+STEPS = ["dedupe", "fetch", "parse", "extract", "prepare", "save"]
+
+# Steps that call out to job sites, OpenAI or Sheets
+RETRIED_STEPS = {"fetch", "extract", "save"}
+
+def create_job_tracker_graph(checkpointer=None, steps=STEPS):
     """
     Creates the LangGraph workflow for job tracking
+    
+    I/O-bound nodes (fetch, extract, save) have native async versions that
+    are used by ainvoke/astream. parse and prepare stay sync; under
+    ainvoke LangGraph runs them in the thread pool.
+    
+    With a checkpointer, state is saved after every node under the run's
+    thread_id, so an interrupted job can pick up where it stopped.
+    
+    A step that reports an error sends the job straight to the "failed"
+    node instead of running the rest of the chain. Nodes that call out to
+    job sites, OpenAI or Sheets are retried on transient errors.
+    
+    steps can be a run of consecutive STEPS to build a graph for part of
+    the flow only (the pipelined batch runner has one per stage).
     """
     
     # Create the graph with our State
     graph = StateGraph(JobTrackerState)
     
-    # Add all nodes to the graph
-    graph.add_node("fetch", fetch_job_page)
-    graph.add_node("parse", parse_content)
-    graph.add_node("extract", extract_details)
-    graph.add_node("prepare", prepare_tracker_entry)
-    graph.add_node("save", save_to_tracker)
+    # Add the nodes to the graph
+    nodes = {
+        "dedupe": check_duplicate,
+        "fetch": RunnableLambda(fetch_job_page, afunc=afetch_job_page, name="fetch"),
+        "parse": parse_content,
+        "extract": RunnableLambda(extract_details, afunc=aextract_details, name="extract"),
+        "prepare": prepare_tracker_entry,
+        "save": RunnableLambda(save_to_tracker, afunc=asave_to_tracker, name="save"),
+    }
+    for step in steps:
+        graph.add_node(step, nodes[step], retry_policy=retry_policy() if step in RETRIED_STEPS else None)
+    graph.add_node("failed", handle_failure)
     
     # Define the flow (edges between nodes)
-    graph.set_entry_point("fetch")  # Start here
-    graph.add_edge("fetch", "parse")       # fetch → parse
-    graph.add_edge("parse", "extract")     # parse → extract
-    graph.add_edge("extract", "prepare")   # extract → prepare
-    graph.add_edge("prepare", "save")      # prepare → save
-    graph.add_edge("save", END)            # save → END
+    graph.set_entry_point(steps[0])  # Start here
+    # dedupe → fetch → parse → extract → prepare → save, stopping early if
+    # the URL is already tracked and leaving for "failed" on any error
+    for step, next_step in zip(steps, steps[1:] + [END]):
+        if step == "dedupe":
+            graph.add_conditional_edges(step, route_after_dedupe, {"next": next_step, "duplicate": END})
+        else:
+            graph.add_conditional_edges(step, route_on_error, {"next": next_step, "failed": "failed"})
+    graph.add_edge("failed", END)          # failed → END
     
     # Compile the graph into a runnable app
-    app = graph.compile()
+    app = graph.compile(checkpointer=checkpointer)
     
     return app
 
+def route_after_dedupe(state: JobTrackerState) -> str:
+    """
+    Known URLs end the run right away
+    """
+    return "duplicate" if state.get("is_duplicate") else "next"
+
+def route_on_error(state: JobTrackerState) -> str:
+    """
+    Failed steps end the run instead of feeding the next node
+    """
+    return "failed" if state.get("error_message") else "next"
+
 # Create the app
 job_tracker_app = create_job_tracker_graph()
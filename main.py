@@ -1,86 +1,426 @@
 from state import JobTrackerState
-from graph import job_tracker_app
+from graph import job_tracker_app, create_job_tracker_graph
+from nodes import ExtractionBatcher
+from utils.http_client import aclose_http_clients
+from utils.http_cache import get_http_cache
+from utils.extraction_cache import get_extraction_cache
+from utils.sheets_client import SheetsWriteBuffer
+from utils.tracker_sink import get_tracker_sink
+from utils.url_utils import canonicalize_url
+from pipeline import StagePipeline
+from utils.metrics import get_metrics
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from contextlib import AsyncExitStack, asynccontextmanager
+import argparse
 import asyncio
-from typing import List
+import config
+import os
+from typing import Any, Callable, Dict, List, Optional
 import time
+import uuid
 
-async def run_job_async(job_url: str, index: int, total: int):
-    print(f"[{index}/{total}] Starting: {job_url[:50]}...")
+async def run_job_async(
+    job_url: str,
+    label: str,
+    run_config: Optional[dict] = None,
+    app=job_tracker_app,
+    resume: bool = False
+):
+    print(f"[{label}] Starting: {job_url[:50]}...")
+    started = time.perf_counter()
     
     try:
-        # Run in thread pool since invoke is blocking
-        loop = asyncio.get_event_loop()
-        final_state = await loop.run_in_executor(
-            None, 
-            job_tracker_app.invoke, 
-            {"job_url": job_url}
-        )
-        
-        if final_state.get('save_status') == 'success':
-            details = final_state['final_details']
-            print(f"[{index}/{total}] {details['Job Title']} at {details['Company']}")
-            return {"status": "success", "details": details, "url": job_url}
+        if resume:
+            final_state = await resume_job(app, job_url, label, run_config)
         else:
-            print(f"[{index}/{total}] Failed")
-            return {"status": "failed", "url": job_url}
+            final_state = await start_job(app, job_url, run_config)
+        
+        result = job_result(final_state, job_url, label)
+        if result["status"] in ("success", "duplicate"):
+            await discard_checkpoints(app, run_config)
             
     except Exception as e:
-        print(f"[{index}/{total}] Error: {str(e)}")
-        return {"status": "error", "error": str(e), "url": job_url}
+        print(f"[{label}] Error: {str(e)}")
+        result = {"status": "error", "error": str(e), "url": job_url}
+    
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+async def resume_job(app, job_url: str, label: str, run_config: dict) -> Dict[str, Any]:
+    """
+    Continue a checkpointed job from its last completed node
+    
+    Jobs that stopped part-way, or where a node reported an error, are
+    re-run from the last checkpoint before the problem. Anything else
+    starts fresh; jobs that finished cleanly have no checkpoints left and
+    stop at the duplicate check.
+    """
+    async for earlier in app.aget_state_history(run_config):
+        if earlier.values and earlier.next and not earlier.values.get('error_message'):
+            print(f"[{label}] Resuming at {', '.join(earlier.next)}")
+            resume_config = {
+                **run_config,
+                "configurable": {**run_config["configurable"], **earlier.config["configurable"]}
+            }
+            return await app.ainvoke(None, config=resume_config)
+    
+    return await start_job(app, job_url, run_config)
+
+
+async def discard_checkpoints(app, run_config: Optional[dict]) -> None:
+    """
+    Delete a finished job's checkpoints so the checkpoint file doesn't grow with every run
+    """
+    thread_id = (run_config or {}).get("configurable", {}).get("thread_id")
+    if thread_id and app.checkpointer:
+        await app.checkpointer.adelete_thread(thread_id)
+
+
+async def start_job(app, job_url: str, run_config: Optional[dict]) -> Dict[str, Any]:
+    """
+    Run a job from the start
+
+    A checkpointed thread that already has state (an earlier run under the
+    same ID) is cleared first, otherwise its old values, such as an
+    error_message, would carry over into the new run.
+    """
+    await discard_checkpoints(app, run_config)
+    # Native async run: fetch/extract/save await on the event loop,
+    # only the CPU-bound nodes go to the thread pool
+    return await app.ainvoke({"job_url": job_url}, config=run_config)
 
 
-async def run_batch_parallel(job_urls: List[str], max_concurrent: int = 5):
+def job_result(final_state: Dict[str, Any], job_url: str, label: str) -> Dict[str, Any]:
+    """
+    Summarize a job's final state for the batch report
+    """
+    if final_state.get('is_duplicate'):
+        print(f"[{label}] Already tracked, skipped")
+        return {"status": "duplicate", "url": job_url}
+    
+    if final_state.get('save_status') == 'success':
+        details = final_state['final_details']
+        print(f"[{label}] {details['Job Title']} at {details['Company']}")
+        return {"status": "success", "details": details, "url": job_url}
+    else:
+        print(f"[{label}] Failed")
+        return {"status": "failed", "error": final_state.get('error_message'), "url": job_url}
+
+
+async def run_batch_parallel(
+    job_urls: List[str],
+    max_concurrent: int = 5,
+    extract_batch_size: int = 0,
+    lean_state: bool = config.LEAN_STATE,
+    batch_id: Optional[str] = None,
+    resume: bool = False,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+):
     """
     Process multiple jobs in parallel with concurrency limit
+    
+    With extract_batch_size > 1, postings that reach the extract node
+    together share one LLM request (fewer tokens, higher latency per job).
+    Use a max_concurrent of at least the batch size so batches can fill up.
+    
+    With lean_state, page HTML and parsed text are spilled to disk and
+    freed as soon as they are consumed, so memory stays flat for big batches.
+    
+    With a batch_id, every job is checkpointed to CHECKPOINT_PATH under
+    "<batch_id>:<canonical URL>" until it finishes cleanly. Running the
+    same batch_id again with resume=True continues unfinished and failed
+    jobs from their last completed node instead of fetching and extracting
+    them again; finished jobs are caught by the duplicate check.
+    
+    on_result, if given, is called with each job's result as soon as the
+    job finishes (for progress reporting while the batch runs).
     """
 
     print(f"\nProcessing {len(job_urls)} jobs (max {max_concurrent} concurrent)...\n")
     
     start_time = time.time()
     
-    # Create tasks
-    tasks = [
-        run_job_async(url, i+1, len(job_urls)) 
-        for i, url in enumerate(job_urls)
-    ]
+    http_cache = get_http_cache()
+    if http_cache:
+        http_cache.reset_stats()
+    extraction_cache = get_extraction_cache()
+    if extraction_cache:
+        extraction_cache.reset_stats()
+    get_metrics().reset()
+    
+    # Saves are buffered and appended to the tracker in bulk
+    sheets_buffer = SheetsWriteBuffer(
+        flush_rows=min(config.SHEETS_FLUSH_ROWS, max_concurrent),
+        append=get_tracker_sink().aappend_rows
+    )
+    run_config = {"configurable": {"sheets_buffer": sheets_buffer, "lean_state": lean_state}}
+    if extract_batch_size > 1:
+        run_config["configurable"]["extract_batcher"] = ExtractionBatcher(batch_size=extract_batch_size)
+    
+    app = job_tracker_app
+    checkpoints = AsyncExitStack()
+    if batch_id:
+        app = create_job_tracker_graph(
+            checkpointer=await checkpoints.enter_async_context(open_checkpointer(config.CHECKPOINT_PATH))
+        )
+        print(f"Checkpointing batch '{batch_id}' to {config.CHECKPOINT_PATH}\n")
+    
+    def job_config(url: str) -> dict:
+        if not batch_id:
+            return run_config
+        return {
+            **run_config,
+            "configurable": {**run_config["configurable"], "thread_id": f"{batch_id}:{canonicalize_url(url)}"}
+        }
     
     # Run with concurrency limit
     semaphore = asyncio.Semaphore(max_concurrent)
     
-    async def limited_task(task):
-        async with semaphore:
-            return await task
+    # Single-flight: URLs for the same posting share one graph run
+    in_flight: Dict[str, asyncio.Future] = {}
     
-    results = await asyncio.gather(*[limited_task(t) for t in tasks])
+    async def limited_task(url: str, index: int):
+        key = canonicalize_url(url)
+        leader = in_flight.get(key)
+        if leader is not None:
+            result = await asyncio.shield(leader)
+            print(f"[{index}/{len(job_urls)}] Same posting as an earlier URL, sharing its result")
+            result = {**result, "url": url, "coalesced": True}
+            if on_result:
+                on_result(result)
+            return result
+        
+        future = asyncio.get_running_loop().create_future()
+        in_flight[key] = future
+        try:
+            async with semaphore:
+                result = await run_job_async(url, f"{index}/{len(job_urls)}", job_config(url), app, resume and bool(batch_id))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        if on_result:
+            on_result(result)
+        return result
+    
+    try:
+        results = await asyncio.gather(
+            *[limited_task(url, i+1) for i, url in enumerate(job_urls)]
+        )
+    finally:
+        await sheets_buffer.flush()
+        # Pooled connections belong to this event loop
+        await aclose_http_clients()
+        await checkpoints.aclose()
     
     elapsed = time.time() - start_time
+    print_batch_summary(results, elapsed, http_cache, extraction_cache)
     
-    # Summary
+    return results
+
+
+async def run_batch_pipelined(
+    job_urls: List[str],
+    fetch_workers: int = config.PIPELINE_FETCH_WORKERS,
+    parse_workers: int = config.PIPELINE_PARSE_WORKERS,
+    extract_workers: int = config.PIPELINE_EXTRACT_WORKERS,
+    save_workers: int = config.PIPELINE_SAVE_WORKERS,
+    queue_size: int = config.PIPELINE_QUEUE_SIZE,
+    extract_batch_size: int = 0,
+    lean_state: bool = config.LEAN_STATE
+):
+    """
+    Process multiple jobs through a stage pipeline
+    
+    Instead of one concurrency limit around the whole graph, fetch, parse,
+    extract and save each get their own pool of workers, connected by
+    bounded queues (see StagePipeline). Size each pool for the resource
+    behind it: many fetch workers for the network, extract workers for the
+    LLM rate limit, save workers for the Sheets quota. The summary shows
+    how busy each stage was, so the bottleneck is easy to spot.
+    """
+    
+    print(f"\nProcessing {len(job_urls)} jobs (pipelined: {fetch_workers} fetch, {parse_workers} parse, "
+          f"{extract_workers} extract, {save_workers} save workers)...\n")
+    
+    start_time = time.time()
+    
+    http_cache = get_http_cache()
+    if http_cache:
+        http_cache.reset_stats()
+    extraction_cache = get_extraction_cache()
+    if extraction_cache:
+        extraction_cache.reset_stats()
+    get_metrics().reset()
+    
+    # Every save worker waits for its row's flush, so flush at most save_workers rows at once
+    sheets_buffer = SheetsWriteBuffer(
+        flush_rows=min(config.SHEETS_FLUSH_ROWS, save_workers),
+        append=get_tracker_sink().aappend_rows
+    )
+    run_config = {"configurable": {"sheets_buffer": sheets_buffer, "lean_state": lean_state}}
+    if extract_batch_size > 1:
+        run_config["configurable"]["extract_batcher"] = ExtractionBatcher(batch_size=extract_batch_size)
+    
+    # URLs for the same posting go through the pipeline once
+    leaders: Dict[str, int] = {}
+    for i, url in enumerate(job_urls):
+        leaders.setdefault(canonicalize_url(url), i)
+    unique_urls = [job_urls[i] for i in leaders.values()]
+    
+    pipeline = StagePipeline(
+        {"fetch": fetch_workers, "parse": parse_workers, "extract": extract_workers, "save": save_workers},
+        queue_size=queue_size
+    )
+    try:
+        final_states = await pipeline.run(unique_urls, run_config)
+    finally:
+        await sheets_buffer.flush()
+        await aclose_http_clients()
+    
+    outcomes = dict(zip(leaders.values(), final_states))
+    results = []
+    for i, url in enumerate(job_urls):
+        leader = leaders[canonicalize_url(url)]
+        if leader != i:
+            print(f"[{i+1}/{len(job_urls)}] Same posting as an earlier URL, sharing its result")
+            results.append({**results[leader], "url": url, "coalesced": True})
+        elif isinstance(outcomes[i], Exception):
+            print(f"[{i+1}/{len(job_urls)}] Error: {str(outcomes[i])}")
+            results.append({"status": "error", "error": str(outcomes[i]), "url": url})
+        else:
+            results.append(job_result(outcomes[i], url, f"{i+1}/{len(job_urls)}"))
+    
+    elapsed = time.time() - start_time
+    print_batch_summary(results, elapsed, http_cache, extraction_cache, stage_report=pipeline.report())
+    
+    return results
+
+
+def print_batch_summary(results: List[dict], elapsed: float, http_cache, extraction_cache, stage_report: List[str] = ()):
     print("\n" + "=" * 70)
     print("BATCH SUMMARY")
     print("=" * 70)
     
-    successful = sum(1 for r in results if r['status'] == 'success')
-    duplicates = sum(1 for r in results if r['status'] == 'duplicate')
-    failed = sum(1 for r in results if r['status'] in ['failed', 'error'])
+    unique = [r for r in results if not r.get('coalesced')]
+    coalesced = len(results) - len(unique)
+    successful = sum(1 for r in unique if r['status'] == 'success')
+    duplicates = sum(1 for r in unique if r['status'] == 'duplicate')
+    failed = sum(1 for r in unique if r['status'] in ['failed', 'error'])
     
     print(f"\nSuccessful: {successful}")
+    print(f"Duplicates: {duplicates}")
+    print(f"Coalesced (same posting twice in batch): {coalesced}")
     print(f"Failed: {failed}")
-    print(f"Total: {len(job_urls)}")
+    print(f"Total: {len(results)}")
     print(f"Time: {elapsed:.1f} seconds")
-    print(f"Speed: {len(job_urls)/elapsed:.1f} jobs/second")
+    print(f"Speed: {len(results)/elapsed:.1f} jobs/second")
+    
+    if http_cache:
+        stats = http_cache.stats()
+        print(f"HTTP cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['revalidations']} revalidated (304)")
+    if extraction_cache:
+        stats = extraction_cache.stats()
+        print(f"Extraction cache: {stats['hits']} hits, {stats['misses']} misses")
+    
+    node_report = get_metrics().report()
+    if node_report:
+        print("\nNodes:")
+        for line in node_report:
+            print(f"  {line}")
+    
+    if stage_report:
+        print("\nStages:")
+        for line in stage_report:
+            print(f"  {line}")
     
     print("\n" + "=" * 70)
+
+
+@asynccontextmanager
+async def open_checkpointer(path: str):
+    """
+    SQLite checkpointer for batch runs (an async context manager)
     
-    return results
+    Its tables are created up front: clearing a thread before the first
+    checkpoint is written would fail otherwise.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(path) as checkpointer:
+        await checkpointer.setup()
+        yield checkpointer
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Track a batch of job postings")
+    parser.add_argument("urls_file", nargs="?", help="File with one job URL per line (default: sample URLs)")
+    parser.add_argument("--max-concurrent", type=int, default=5, help="Jobs processed at the same time")
+    parser.add_argument("--extract-batch-size", type=int, default=0, help="Postings per LLM request (0 = one each)")
+    parser.add_argument("--lean-state", action="store_true", default=config.LEAN_STATE,
+                        help="Spill page HTML and parsed text to disk")
+    parser.add_argument("--batch-id", help="Checkpoint the run under this ID (default: a new ID)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the batch given by --batch-id from its checkpoints")
+    parser.add_argument("--metrics-out", help="Write per-node metrics to this file (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Run fetch, parse, extract and save as separate stages with their own workers")
+    parser.add_argument("--fetch-workers", type=int, default=config.PIPELINE_FETCH_WORKERS)
+    parser.add_argument("--parse-workers", type=int, default=config.PIPELINE_PARSE_WORKERS)
+    parser.add_argument("--extract-workers", type=int, default=config.PIPELINE_EXTRACT_WORKERS)
+    parser.add_argument("--save-workers", type=int, default=config.PIPELINE_SAVE_WORKERS)
+    args = parser.parse_args(argv)
+    
+    if args.resume and not args.batch_id:
+        parser.error("--resume needs the --batch-id of the run to continue")
+    if args.pipelined and args.batch_id:
+        parser.error("pipelined runs are not checkpointed, drop --batch-id/--resume")
+    return args
 
 
 if __name__ == "__main__":
-    job_urls = [
-        "https://www.linkedin.com/jobs/view/4219256012",
-        "https://www.linkedin.com/jobs/view/4219256012",
-        "https://www.linkedin.com/jobs/view/4196121788",
-    ]
-    
-    # Run parallel batch
-    asyncio.run(run_batch_parallel(job_urls, max_concurrent=5))
\ No newline at end of file
+    args = parse_args()
+    
+    if args.urls_file:
+        with open(args.urls_file, encoding="utf-8") as f:
+            job_urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        job_urls = [
+            "https://www.linkedin.com/jobs/view/4219256012",
+            "https://www.linkedin.com/jobs/view/4219256012",
+            "https://www.linkedin.com/jobs/view/4196121788",
+        ]
+    
+    if args.pipelined:
+        asyncio.run(run_batch_pipelined(
+            job_urls,
+            fetch_workers=args.fetch_workers,
+            parse_workers=args.parse_workers,
+            extract_workers=args.extract_workers,
+            save_workers=args.save_workers,
+            extract_batch_size=args.extract_batch_size,
+            lean_state=args.lean_state
+        ))
+    else:
+        batch_id = args.batch_id
+        if not batch_id and config.CHECKPOINT_ENABLED:
+            batch_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        if batch_id and not args.resume:
+            print(f"Batch ID: {batch_id} (if the run stops, continue it with --resume --batch-id {batch_id})")
+        
+        # Run parallel batch
+        asyncio.run(run_batch_parallel(
+            job_urls,
+            max_concurrent=args.max_concurrent,
+            extract_batch_size=args.extract_batch_size,
+            lean_state=args.lean_state,
+            batch_id=batch_id,
+            resume=args.resume
+        ))
+    
+    if args.metrics_out:
+        get_metrics().export(args.metrics_out)
+        print(f"Metrics written to {args.metrics_out}")
@@ -1,16 +1,24 @@
 """
 Nodes package - contains all node functions
 """
-from .fetch import fetch_job_page
+from .dedupe import check_duplicate
+from .fetch import fetch_job_page, afetch_job_page
 from .parse import parse_content
-from .extract import extract_details
+from .extract import extract_details, aextract_details, ExtractionBatcher
 from .prepare import prepare_tracker_entry
-from .save import save_to_tracker
+from .save import save_to_tracker, asave_to_tracker
+from .failure import handle_failure
 
 __all__ = [
+    'check_duplicate',
     'fetch_job_page',
+    'afetch_job_page',
     'parse_content',
     'extract_details',
+    'aextract_details',
+    'ExtractionBatcher',
     'prepare_tracker_entry',
-    'save_to_tracker'
-]
\ No newline at end of file
+    'save_to_tracker',
+    'asave_to_tracker',
+    'handle_failure'
+]
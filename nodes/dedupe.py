@@ -0,0 +1,26 @@
+from typing import Dict, Any
+from state import JobTrackerState
+from utils.url_index import get_url_index
+
+def check_duplicate(state: JobTrackerState) -> Dict[str, Any]:
+    """
+    Node 0: Skip jobs that are already in the tracker
+    
+    Looks the canonical URL up in the local URL index so known postings
+    stop here, before any network or LLM work
+    """
+    index = get_url_index()
+    if index is None:
+        return {"is_duplicate": False}
+    
+    try:
+        index.ensure_seeded()
+        if index.contains(state['job_url']):
+            print(f"Already in tracker, skipping: {state['job_url']}")
+            return {"is_duplicate": True}
+    
+    except Exception as e:
+        # A broken index must never stop a job from being tracked
+        print(f"Error checking URL index: {str(e)}")
+    
+    return {"is_duplicate": False}
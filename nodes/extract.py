@@ -1,102 +1,441 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from state import JobTrackerState
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
 import os
 from dotenv import load_dotenv
 import json
+import asyncio
+import config
+from config import runtime_option
+from utils.extraction_cache import get_extraction_cache, extraction_cache_key
+from utils.content_selector import select_relevant_content
+from utils.blob_store import load_text, releases
+from utils.resilience import is_transient
+from utils.rate_limiter import get_rate_limiter
+from utils.tokens import count_tokens
+from utils.metrics import record, traced
 
 # Load environment variables
 load_dotenv()
 
+# Fields the LLM extracts: (key, description, example value)
+FIELDS = [
+    ("job_title", "The position title", "Senior Software Engineer"),
+    ("company", "Company name", "Tech Corp"),
+    ("location", 'Job location (city/state or "Remote")', "San Francisco, CA"),
+    ("job_type", "Full-time, Part-time, Contract, Internship, etc.", "Full-time"),
+    ("workplace_type", "Remote, Hybrid, or Onsite", "Hybrid"),
+    ("salary", 'Salary range if mentioned, otherwise "Not mentioned"', "$120k-$180k"),
+    ("experience_required", 'Years of experience needed (e.g., "2-4 years")', "5+ years"),
+    ("skills_required", "List of top 5-7 required skills", ["Python", "AWS", "Docker", "React", "PostgreSQL"]),
+    ("posted_date", "When the job was posted, if available", "2 days ago"),
+    ("application_deadline", "Deadline if mentioned", "Not mentioned"),
+]
+
+
+def build_system_prompt(fields: List[tuple]) -> str:
+    """
+    System prompt asking for the given fields only
+    """
+    numbered = "\n".join(
+        f"{i}. {key}: {description}" for i, (key, description, _) in enumerate(fields, start=1)
+    )
+    example = ",\n".join(f'    "{key}": {json.dumps(value)}' for key, _, value in fields)
+    return f"""You are a job posting analyzer. Extract the following information from the job posting text:
+
+{numbered}
+
+Return ONLY a valid JSON object with these fields. If information is not found, use "Not mentioned" or an empty list for skills.
+
+Example format:
+{{
+{example}
+}}"""
+
+
+SYSTEM_PROMPT = build_system_prompt(FIELDS)
+
+# Used when several postings are packed into one request (see ExtractionBatcher)
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+You will receive several job postings, each starting with a line like "=== Posting 1 ===".
+Return ONLY a valid JSON array with exactly one object per posting, in the same order as the postings."""
+
+# Rough size of one JSON answer, counted against the tokens-per-minute limit
+COMPLETION_TOKENS_ESTIMATE = 300
+
+_llm = None
+
+@traced("extract")
+@releases("parsed_content")
 def extract_details(state: JobTrackerState) -> Dict[str, Any]:
     """
     Node 3: Extract job details using LLM
     
-    Uses an LLM to extract structured information from parsed content
+    Uses an LLM to extract structured information from parsed content.
+    Fields already read from the page's JSON-LD/OpenGraph metadata are
+    not asked for again, and the LLM is skipped when they cover every
+    field.
     """
+    structured = state.get('structured_details') or {}
+    if _is_complete(structured):
+        print("Job details found in page metadata, skipping LLM!")
+        record("llm_skipped")
+        return {"extracted_details": _merge_details({}, structured)}
+    
     print(f"Extracting job details using LLM...")
     
     # Check if we have parsed content
-    if not state.get('parsed_content'):
+    parsed_content = load_text(state, 'parsed_content')
+    if not parsed_content:
         print("No parsed_content found in state!")
         return {
             "error_message": "No parsed content to extract from"
         }
     
+    response = None
     try:
-        # Initialize the LLM
-        llm = ChatOpenAI(
-            model="gpt-4o-mini",  # Cheaper and faster model
-            temperature=0,  # Deterministic output
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
-        
-        # Create the prompt
-        system_prompt = """You are a job posting analyzer. Extract the following information from the job posting text:
-
-1. job_title: The position title
-2. company: Company name
-3. location: Job location (city/state or "Remote")
-4. job_type: Full-time, Part-time, Contract, Internship, etc.
-5. workplace_type: Remote, Hybrid, or Onsite
-6. salary: Salary range if mentioned, otherwise "Not mentioned"
-7. experience_required: Years of experience needed (e.g., "2-4 years")
-8. skills_required: List of top 5-7 required skills
-9. posted_date: When the job was posted, if available
-10. application_deadline: Deadline if mentioned
-
-Return ONLY a valid JSON object with these fields. If information is not found, use "Not mentioned" or an empty list for skills.
-
-Example format:
-{
-    "job_title": "Senior Software Engineer",
-    "company": "Tech Corp",
-    "location": "San Francisco, CA",
-    "job_type": "Full-time",
-    "workplace_type": "Hybrid",
-    "salary": "$120k-$180k",
-    "experience_required": "5+ years",
-    "skills_required": ["Python", "AWS", "Docker", "React", "PostgreSQL"],
-    "posted_date": "2 days ago",
-    "application_deadline": "Not mentioned"
-}"""
-        
-        # Truncate content if too long (to save tokens)
-        content = state['parsed_content']
-        max_chars = 8000  # Limit content size
-        if len(content) > max_chars:
-            content = content[:max_chars] + "\n\n[Content truncated...]"
-            print(f"Content truncated to {max_chars} characters")
+        content = _select_content(parsed_content)
+        messages = _build_messages(content, _missing_fields(structured))
         
-        # Create messages
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Job Posting Content:\n\n{content}")
-        ]
+        # Same content + prompt + model as before: reuse the earlier answer
+        cache_key = _cache_key(messages)
+        cached = _cached_details(cache_key)
+        if cached is not None:
+            return {"extracted_details": _merge_details(cached, structured)}
         
         # Call the LLM
         print("Calling LLM...")
-        response = llm.invoke(messages)
+        response = _invoke_llm(messages)
         
-        # Parse the JSON response
-        extracted_data = json.loads(response.content)
+        return _parse_response(response.content, cache_key, structured)
         
-        print("Successfully extracted job details!")
+    except json.JSONDecodeError as e:
+        print(f"Error parsing LLM response as JSON: {str(e)}")
+        print(f"Response was: {response.content[:200]}...")
+        return {
+            "error_message": f"JSON parsing error: {str(e)}"
+        }
+    
+    except Exception as e:
+        if is_transient(e):
+            print(f"Error extracting details (will retry): {str(e)}")
+            raise
+        print(f"Error extracting details: {str(e)}")
+        return {
+            "error_message": f"Extraction error: {str(e)}"
+        }
+
 
+@traced("extract")
+@releases("parsed_content")
+async def aextract_details(state: JobTrackerState) -> Dict[str, Any]:
+    """
+    Node 3 (async): Extract job details using LLM without blocking the event loop
+    """
+    structured = state.get('structured_details') or {}
+    if _is_complete(structured):
+        print("Job details found in page metadata, skipping LLM!")
+        record("llm_skipped")
+        return {"extracted_details": _merge_details({}, structured)}
+    
+    print(f"Extracting job details using LLM...")
+    
+    parsed_content = load_text(state, 'parsed_content')
+    if not parsed_content:
+        print("No parsed_content found in state!")
         return {
-            "extracted_details": extracted_data
+            "error_message": "No parsed content to extract from"
         }
+    
+    response = None
+    try:
+        content = _select_content(parsed_content)
+        # Batched requests ask for every field (BATCH_SYSTEM_PROMPT), so
+        # they are built and cached as full extractions
+        batcher = runtime_option("extract_batcher")
+        fields = FIELDS if batcher is not None else _missing_fields(structured)
+        messages = _build_messages(content, fields)
+        
+        # Same content + prompt + model as before: reuse the earlier answer
+        cache_key = _cache_key(messages)
+        cached = _cached_details(cache_key)
+        if cached is not None:
+            return {"extracted_details": _merge_details(cached, structured)}
+        
+        # Batch mode: share one LLM request with other postings in flight
+        if batcher is not None:
+            print("Queued for batched extraction...")
+            extracted_data = await batcher.extract(content)
+            return _store_details(extracted_data, cache_key, structured)
+        
+        print("Calling LLM...")
+        response = await _ainvoke_llm(messages)
+        
+        return _parse_response(response.content, cache_key, structured)
         
     except json.JSONDecodeError as e:
         print(f"Error parsing LLM response as JSON: {str(e)}")
-        print(f"Response was: {response.content[:200]}...")
+        if response is not None:  # Batched answers are parsed by the batcher
+            print(f"Response was: {response.content[:200]}...")
         return {
             "error_message": f"JSON parsing error: {str(e)}"
         }
     
     except Exception as e:
+        if is_transient(e):
+            print(f"Error extracting details (will retry): {str(e)}")
+            raise
         print(f"Error extracting details: {str(e)}")
         return {
             "error_message": f"Extraction error: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+
+async def aextract_batch(contents: List[str]) -> List[Dict[str, Any]]:
+    """
+    Extract details for several postings with a single LLM request
+    
+    The system prompt is sent once for the whole batch and the JSON array
+    in the answer is split back into one dict per posting.
+    """
+    postings = "\n\n".join(
+        f"=== Posting {i} ===\n{content}" for i, content in enumerate(contents, start=1)
+    )
+    messages = [
+        SystemMessage(content=BATCH_SYSTEM_PROMPT),
+        HumanMessage(content=f"Job Posting Contents:\n\n{postings}")
+    ]
+    
+    print(f"Calling LLM for a batch of {len(contents)} postings...")
+    response = await _ainvoke_llm(messages, answers=len(contents))
+    
+    results = json.loads(response.content)
+    if not isinstance(results, list) or len(results) != len(contents):
+        raise ValueError(f"Expected a JSON array of {len(contents)} objects from the LLM")
+    return results
+
+
+def _get_llm() -> ChatOpenAI:
+    """
+    Get the shared LLM client (created once, reused by every call)
+    """
+    global _llm
+    if _llm is None:
+        _llm = ChatOpenAI(
+            model=config.OPENAI_MODEL,
+            temperature=0,  # Deterministic output
+            api_key=os.getenv("OPENAI_API_KEY")
+        )
+    return _llm
+
+
+def _invoke_llm(messages: List[BaseMessage], answers: int = 1) -> BaseMessage:
+    """
+    Call the LLM once the shared rate limiter has room for the request
+    """
+    limiter = get_rate_limiter()
+    estimate = _estimate_tokens(messages, answers)
+    if limiter is not None:
+        limiter.acquire(config.OPENAI_MODEL, estimate)
+    response = _get_llm().invoke(messages)
+    _settle_tokens(limiter, estimate, response)
+    return response
+
+
+async def _ainvoke_llm(messages: List[BaseMessage], answers: int = 1) -> BaseMessage:
+    """
+    Call the LLM once the shared rate limiter has room for the request (async)
+    """
+    limiter = get_rate_limiter()
+    estimate = _estimate_tokens(messages, answers)
+    if limiter is not None:
+        await limiter.aacquire(config.OPENAI_MODEL, estimate)
+    response = await _get_llm().ainvoke(messages)
+    # Settling writes to the shared limiter file, keep it off the event loop
+    await asyncio.to_thread(_settle_tokens, limiter, estimate, response)
+    return response
+
+
+def _estimate_tokens(messages: List[BaseMessage], answers: int) -> int:
+    """
+    Prompt tokens plus the expected size of the answer(s)
+    """
+    return sum(count_tokens(message.content) for message in messages) + answers * COMPLETION_TOKENS_ESTIMATE
+
+
+def _settle_tokens(limiter, estimate: int, response: BaseMessage) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    record("llm_calls")
+    if not usage:
+        return
+    record("prompt_tokens", usage["input_tokens"])
+    record("completion_tokens", usage["output_tokens"])
+    if limiter is not None:
+        limiter.settle(config.OPENAI_MODEL, estimate, usage["total_tokens"])
+
+
+def _build_messages(content: str, fields: List[tuple] = FIELDS) -> List[BaseMessage]:
+    """
+    Build the chat messages for one (already selected) job posting
+    """
+    system_prompt = SYSTEM_PROMPT if fields == FIELDS else build_system_prompt(fields)
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=f"Job Posting Content:\n\n{content}")
+    ]
+
+
+def _select_content(content: str) -> str:
+    """
+    Keep the most extraction-relevant sections within the token budget
+    (instead of cutting long postings off at a fixed length)
+    """
+    selected = select_relevant_content(content, config.EXTRACT_TOKEN_BUDGET)
+    if len(selected) < len(content):
+        print(f"Content reduced from {len(content)} to {len(selected)} characters")
+    return selected
+
+
+def _cache_key(messages: List[BaseMessage]) -> str:
+    """
+    Cache key over the system prompt, the selected content and the model
+    """
+    return extraction_cache_key(config.OPENAI_MODEL, messages[0].content, messages[1].content)
+
+
+def _cached_details(cache_key: str) -> Optional[Dict[str, Any]]:
+    cache = get_extraction_cache()
+    if cache is None:
+        return None
+    
+    cached = cache.get(cache_key)
+    if cached is not None:
+        print("Job details served from extraction cache!")
+        record("cache_hits")
+    return cached
+
+
+def _parse_response(content: str, cache_key: str, structured: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse the JSON response from the LLM into the extract node's state update
+    """
+    return _store_details(json.loads(content), cache_key, structured)
+
+
+def _store_details(extracted_data: Dict[str, Any], cache_key: str, structured: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Cache the LLM's answer and build the extract node's state update
+    """
+    print("Successfully extracted job details!")
+    
+    cache = get_extraction_cache()
+    if cache is not None:
+        cache.put(cache_key, config.OPENAI_MODEL, extracted_data)
+
+    return {
+        "extracted_details": _merge_details(extracted_data, structured)
+    }
+
+
+def _is_complete(structured: Dict[str, Any]) -> bool:
+    """
+    Does the page metadata cover every field the LLM would be asked for?
+    """
+    return bool(structured) and all(key in structured for key, _, _ in FIELDS)
+
+
+def _missing_fields(structured: Dict[str, Any]) -> List[tuple]:
+    """
+    The fields the LLM still has to find
+    """
+    return [field for field in FIELDS if field[0] not in structured] or FIELDS
+
+
+def _merge_details(extracted_data: Dict[str, Any], structured: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine LLM output with page metadata (metadata wins) and fill any gaps
+    """
+    details = {**extracted_data, **structured}
+    for key, _, example in FIELDS:
+        if key not in details:
+            details[key] = [] if isinstance(example, list) else "Not mentioned"
+    return details
+
+
+class ExtractionBatcher:
+    """
+    Packs concurrent extraction requests into multi-posting LLM calls
+    
+    Postings queue up until batch_size are waiting or max_wait seconds have
+    passed, then go out as one request. If a batch answer can't be split
+    back into one object per posting, its postings are retried one by one.
+    """
+    
+    def __init__(self, batch_size: int = 5, max_wait: float = 0.5):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+    
+    async def extract(self, content: str) -> Dict[str, Any]:
+        """
+        Queue one (already selected) posting and wait for its extracted details
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((content, future))
+        
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[tuple]) -> None:
+        contents = [content for content, _ in batch]
+        if len(batch) == 1:
+            # Nothing to split up: a failure goes straight back to the node
+            try:
+                results = [await _aextract_one(contents[0])]
+            except Exception as e:
+                results = [e]
+            self._deliver(batch, results)
+            return
+        
+        try:
+            results = await aextract_batch(contents)
+        except Exception as e:
+            print(f"Batched extraction failed ({str(e)}), extracting one by one...")
+            results = await asyncio.gather(
+                *[_aextract_one(content) for content in contents],
+                return_exceptions=True
+            )
+        self._deliver(batch, results)
+    
+    def _deliver(self, batch: List[tuple], results: List[Any]) -> None:
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+async def _aextract_one(content: str) -> Dict[str, Any]:
+    response = await _ainvoke_llm(_build_messages(content))
+    return json.loads(response.content)
@@ -0,0 +1,11 @@
+from typing import Dict, Any
+from state import JobTrackerState
+
+def handle_failure(state: JobTrackerState) -> Dict[str, Any]:
+    """
+    Terminal node: a step failed, so the remaining steps are skipped
+    
+    The failing node already put the reason in error_message.
+    """
+    print(f"Job failed, skipping remaining steps: {state.get('error_message', 'Unknown error')}")
+    return {}
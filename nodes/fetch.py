@@ -1,32 +1,204 @@
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+import httpx
 from state import JobTrackerState
+from utils.http_client import get_http_client, get_async_http_client
+from utils.http_cache import get_http_cache, CachedResponse
+from utils.body_reader import BodyReader
+from utils.blob_store import store_text
+from utils.metrics import record, traced
+from utils.resilience import (
+    TransientError,
+    get_circuit_breaker,
+    is_blocking_status,
+    is_transient,
+    is_transient_status
+)
 
+@traced("fetch")
 def fetch_job_page(state: JobTrackerState) -> Dict[str, Any]:
     """
     Node 1: Fetch the job posting webpage
+    
+    Serves fresh pages from the HTTP cache and revalidates stale ones.
+    The body is streamed and decoded in chunks, capped at FETCH_MAX_BYTES
+    and cut short once the job description is over (see BodyReader).
+    
+    Rate limits, 5xx responses and network errors are raised as transient
+    errors for the node's retry policy. Hosts that keep failing or
+    blocking us are skipped while their circuit breaker is open.
     """
     print(f"Fetching job page: {state['job_url']}")
     
     try:
-        response = requests.get(state['job_url'], timeout=10)
+        cached, headers = _check_cache(state['job_url'])
+        if cached is not None and not headers:
+            return _fetched(cached.body)
+        
+        breaker = get_circuit_breaker(state['job_url'])
+        if not breaker.allow():
+            return _circuit_open(breaker.host)
         
-        if response.status_code == 200:
-            print("Page fetched successfully!")
-            return {
-                "raw_html": response.text,
-                "fetch_status": "success"
-            }
-        else:
-            print(f"Failed to fetch. Status code: {response.status_code}")
-            return {
-                "fetch_status": "failed",
-                "error_message": f"HTTP {response.status_code}"
-            }
+        # Pooled keep-alive client: no new handshake per posting on the same host
+        client = get_http_client(state['job_url'])
+        with client.stream("GET", state['job_url'], headers=headers) as response:
+            record("http_requests")
+            _record_status(breaker, response.status_code)
+            body = None
+            if response.status_code == 200:
+                reader = BodyReader(state['job_url'], response.encoding)
+                for chunk in response.iter_bytes():
+                    if reader.feed(chunk):
+                        break
+                body = _finish_read(reader)
+        return _handle_response(state['job_url'], response, cached, body)
             
     except Exception as e:
+        if is_transient(e):
+            if isinstance(e, httpx.TransportError):
+                get_circuit_breaker(state['job_url']).record_failure()
+            print(f"Error fetching page (will retry): {str(e)}")
+            raise
         print(f"Error fetching page: {str(e)}")
         return {
             "fetch_status": "failed",
             "error_message": str(e)
-        }
\ No newline at end of file
+        }
+
+
+@traced("fetch")
+async def afetch_job_page(state: JobTrackerState) -> Dict[str, Any]:
+    """
+    Node 1 (async): Fetch the job posting webpage without blocking the event loop
+    """
+    print(f"Fetching job page: {state['job_url']}")
+    
+    try:
+        cached, headers = _check_cache(state['job_url'])
+        if cached is not None and not headers:
+            return _fetched(cached.body)
+        
+        breaker = get_circuit_breaker(state['job_url'])
+        if not breaker.allow():
+            return _circuit_open(breaker.host)
+        
+        client = get_async_http_client(state['job_url'])
+        async with client.stream("GET", state['job_url'], headers=headers) as response:
+            record("http_requests")
+            _record_status(breaker, response.status_code)
+            body = None
+            if response.status_code == 200:
+                reader = BodyReader(state['job_url'], response.encoding)
+                async for chunk in response.aiter_bytes():
+                    if reader.feed(chunk):
+                        break
+                body = _finish_read(reader)
+        return _handle_response(state['job_url'], response, cached, body)
+            
+    except Exception as e:
+        if is_transient(e):
+            if isinstance(e, httpx.TransportError):
+                get_circuit_breaker(state['job_url']).record_failure()
+            print(f"Error fetching page (will retry): {str(e)}")
+            raise
+        print(f"Error fetching page: {str(e)}")
+        return {
+            "fetch_status": "failed",
+            "error_message": str(e)
+        }
+
+
+def _check_cache(url: str) -> Tuple[Optional[CachedResponse], Dict[str, str]]:
+    """
+    Look the URL up in the HTTP cache
+    
+    Returns the cached entry (if any) and the conditional request headers.
+    A cached entry with no headers is fresh and can be used as is.
+    """
+    cache = get_http_cache()
+    if cache is None:
+        return None, {}
+    
+    cached = cache.lookup(url)
+    if cached is None:
+        return None, {}
+    
+    if cache.is_fresh(cached):
+        print("Page served from cache!")
+        cache.record("hits")
+        record("cache_hits")
+        return cached, {}
+    
+    headers = cache.conditional_headers(cached)
+    if not headers:
+        # Stale and nothing to revalidate with: fetch it again
+        return None, {}
+    return cached, headers
+
+
+def _finish_read(reader: BodyReader) -> str:
+    body = reader.text()
+    record("bytes", reader.bytes_read)
+    if reader.truncated:
+        print(f"Stopped reading page after {reader.bytes_read} bytes")
+    return body
+
+
+def _handle_response(url: str, response, cached: Optional[CachedResponse], body: Optional[str]) -> Dict[str, Any]:
+    """
+    Turn an HTTP response (and its streamed body) into the state update for the fetch node
+    """
+    cache = get_http_cache()
+    
+    if response.status_code == 304 and cached is not None:
+        print("Page not modified, using cached copy!")
+        cache.record("revalidations")
+        record("cache_revalidations")
+        cache.mark_revalidated(
+            cached,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        )
+        return _fetched(cached.body)
+    
+    if response.status_code == 200:
+        if cache is not None:
+            cache.record("misses")
+            if "no-store" not in response.headers.get("Cache-Control", ""):
+                cache.store(
+                    url,
+                    body,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified")
+                )
+        print("Page fetched successfully!")
+        return _fetched(body)
+    elif is_transient_status(response.status_code):
+        raise TransientError(f"HTTP {response.status_code}")
+    else:
+        print(f"Failed to fetch. Status code: {response.status_code}")
+        return {
+            "fetch_status": "failed",
+            "error_message": f"HTTP {response.status_code}"
+        }
+
+
+def _record_status(breaker, status_code: int) -> None:
+    if is_blocking_status(status_code):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def _circuit_open(host: str) -> Dict[str, Any]:
+    print(f"Too many failures from {host}, skipping it for now")
+    return {
+        "fetch_status": "failed",
+        "error_message": f"Circuit open for {host}"
+    }
+
+
+def _fetched(html: str) -> Dict[str, Any]:
+    return {
+        **store_text("raw_html", html),
+        "fetch_status": "success"
+    }
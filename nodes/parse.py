@@ -2,50 +2,80 @@ from bs4 import BeautifulSoup
 from typing import Dict, Any
 from state import JobTrackerState
 from utils.content_cleaner import clean_content_by_site
+from utils.html_text import html_to_text
+from utils.structured_data import extract_structured_details
+from utils.blob_store import store_text, load_text, releases
+from utils.metrics import record, traced
+import config
+from config import runtime_option
 
+@traced("parse")
+@releases("raw_html")
 def parse_content(state: JobTrackerState) -> Dict[str, Any]:
     """
     Node 2: Parse HTML and extract clean text content
     
-    Takes raw_html from state and returns parsed_content
+    Takes raw_html from state and returns parsed_content, plus any job
+    details found in the page's structured metadata
+    
+    PARSER_MODE picks the text extraction: "fast" streams lxml parse events
+    into lines without building a tree, "soup" uses BeautifulSoup. Both give
+    the same text.
     """
     print(f"Parsing HTML content...")
     
     # Check if we have HTML to parse
-    if not state.get('raw_html'):
+    raw_html = load_text(state, 'raw_html')
+    if not raw_html:
         print("No raw_html found in state!")
         return {
             "error_message": "No HTML content to parse"
         }
     
     try:
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(state['raw_html'], 'lxml')
-        
-        # Remove script and style elements
-        for script in soup(['script', 'style', 'nav', 'footer', 'header']):
-            script.decompose()
-        
-        # Get text content
-        text = soup.get_text(separator='\n', strip=True)
-        
-        # Clean up: remove excessive whitespace
-        lines = [line.strip() for line in text.splitlines()]
-        lines = [line for line in lines if line]  # Remove empty lines
-        parsed_text = '\n'.join(lines)
+        if runtime_option("parser_mode", config.PARSER_MODE) == "soup":
+            parsed_text = _soup_to_text(raw_html)
+        else:
+            parsed_text = html_to_text(raw_html)
         
         # Apply site-specific cleaning
         # print(f"   Applying site-specific cleaning...")
         cleaned_text = clean_content_by_site(parsed_text, state['job_url'])
+        record("html_chars", len(raw_html))
+        record("text_chars", len(cleaned_text))
         
         # print(f"Final cleaned text: {len(cleaned_text)} characters")
         
+        # Job details embedded as schema.org JobPosting / OpenGraph metadata
+        structured_details = extract_structured_details(raw_html)
+        
         return {
-            "parsed_content": cleaned_text
+            **store_text("parsed_content", cleaned_text),
+            "structured_details": structured_details
         }
 
     except Exception as e:
         print(f"Error parsing HTML: {str(e)}")
         return {
             "error_message": f"Parsing error: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+
+def _soup_to_text(html: str) -> str:
+    """
+    Original text extraction through a full BeautifulSoup tree
+    """
+    # Parse HTML with BeautifulSoup
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # Remove script and style elements
+    for script in soup(['script', 'style', 'nav', 'footer', 'header']):
+        script.decompose()
+    
+    # Get text content
+    text = soup.get_text(separator='\n', strip=True)
+    
+    # Clean up: remove excessive whitespace
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]  # Remove empty lines
+    return '\n'.join(lines)
@@ -1,7 +1,9 @@
 from typing import Dict, Any
 from state import JobTrackerState
 from datetime import datetime
+from utils.metrics import traced
 
+@traced("prepare")
 def prepare_tracker_entry(state: JobTrackerState) -> Dict[str, Any]:
     """
     Node 5: Prepare data for tracker
@@ -1,23 +1,22 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from state import JobTrackerState
-import gspread
-from google.oauth2.service_account import Credentials
-import os
-from dotenv import load_dotenv
-
-# Google Sheets configuration
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
-]
+from config import runtime_option
+from utils.tracker_sink import get_tracker_sink
+from utils.url_index import get_url_index
+from utils.resilience import is_transient
+from utils.metrics import traced
 
+@traced("save")
 def save_to_tracker(state: JobTrackerState) -> Dict[str, Any]:
     """
-    Node 6: Save job details to Google Sheets tracker
+    Node 6: Save job details to the tracker
     
-    Appends the job to a Google Sheet
+    Appends the job to the tracker sink picked by TRACKER_SINK: the
+    Google Sheet, the local tracker, or the local tracker mirrored to
+    the sheet in the background
     """
-    print(f"Saving to Google Sheets tracker...")
+    sink = get_tracker_sink()
+    print(f"Saving to {sink.name}...")
     
     # Check if we have final details
     if not state.get('final_details'):
@@ -29,44 +28,70 @@ def save_to_tracker(state: JobTrackerState) -> Dict[str, Any]:
     try:
         final_details = state['final_details']
         
-        # Authenticate with Google Sheets
-        creds = Credentials.from_service_account_file(
-            'credentials.json',
-            scopes=SCOPES
-        )
-        client = gspread.authorize(creds)
+        # Prepare row data (must match column order in sheet)
+        row_data = _build_row(final_details)
         
-        # Open the sheet
-        # REPLACE THIS WITH YOUR SHEET ID
-        SHEET_ID = os.getenv("SHEET_ID")
-        spreadsheet = client.open_by_key(SHEET_ID)
-        worksheet = spreadsheet.sheet1  # First sheet
+        # Append the row; its row number comes back in the append response,
+        # so there is no need to re-read the whole sheet
+        tracker_id = sink.append_rows([row_data])[0]
         
-        # Prepare row data (must match column order in sheet)
-        row_data = [
-            final_details['Job Title'],
-            final_details['Company'],
-            final_details['Location'],
-            final_details['Job Type'],
-            final_details['Workplace Type'],
-            final_details['Salary'],
-            final_details['Experience Required'],
-            final_details['Skills Required'],
-            final_details['Posted Date'],
-            final_details['Application Deadline'],
-            final_details['Date Added'],
-            final_details['Job URL'],
-            final_details['Notes']
-        ]
+        print(f"Saved to {sink.name}! Row #{tracker_id}")
+        print(f"View at: {sink.location()}")
+        _remember_url(state['job_url'], tracker_id)
         
-        # Append the row
-        worksheet.append_row(row_data)
+        return {
+            "save_status": "success",
+            "tracker_id": tracker_id
+        }
+        
+    except FileNotFoundError:
+        print(f"credentials.json not found!")
+        return {
+            "save_status": "failed",
+            "error_message": "credentials.json file not found"
+        }
+    
+    except Exception as e:
+        if is_transient(e):
+            print(f"Error saving to {sink.name} (will retry): {str(e)}")
+            raise
+        print(f"Error saving to {sink.name}: {str(e)}")
+        return {
+            "save_status": "failed",
+            "error_message": f"Save error: {str(e)}"
+        }
+
+
+@traced("save")
+async def asave_to_tracker(state: JobTrackerState) -> Dict[str, Any]:
+    """
+    Node 6 (async): Save job details to the tracker
+    
+    Sheets appends go through the Sheets REST API so the event loop is never
+    blocked on a gspread call. In batch runs the row goes through the
+    shared write-behind buffer and is appended together with other rows.
+    """
+    sink = get_tracker_sink()
+    print(f"Saving to {sink.name}...")
+    
+    if not state.get('final_details'):
+        print("No final_details found!")
+        return {
+            "error_message": "No details to save"
+        }
+    
+    try:
+        row_data = _build_row(state['final_details'])
         
-        # Get the row number (last row)
-        tracker_id = str(len(worksheet.get_all_values()))
+        write_buffer = runtime_option("sheets_buffer")
+        if write_buffer is not None:
+            tracker_id = await write_buffer.append(row_data)
+        else:
+            tracker_id = (await sink.aappend_rows([row_data]))[0]
         
-        print(f"Saved to Google Sheets! Row #{tracker_id}")
-        print(f"View at: https://docs.google.com/spreadsheets/d/{SHEET_ID}")
+        print(f"Saved to {sink.name}! Row #{tracker_id}")
+        print(f"View at: {sink.location()}")
+        _remember_url(state['job_url'], tracker_id)
         
         return {
             "save_status": "success",
@@ -81,8 +106,45 @@ def save_to_tracker(state: JobTrackerState) -> Dict[str, Any]:
         }
     
     except Exception as e:
-        print(f"Error saving to Google Sheets: {str(e)}")
+        if is_transient(e):
+            print(f"Error saving to {sink.name} (will retry): {str(e)}")
+            raise
+        print(f"Error saving to {sink.name}: {str(e)}")
         return {
             "save_status": "failed",
             "error_message": f"Save error: {str(e)}"
-        }
\ No newline at end of file
+        }
+
+
+def _build_row(final_details: Dict[str, Any]) -> List[Any]:
+    """
+    Prepare row data (must match column order in sheet)
+    """
+    return [
+        final_details['Job Title'],
+        final_details['Company'],
+        final_details['Location'],
+        final_details['Job Type'],
+        final_details['Workplace Type'],
+        final_details['Salary'],
+        final_details['Experience Required'],
+        final_details['Skills Required'],
+        final_details['Posted Date'],
+        final_details['Application Deadline'],
+        final_details['Date Added'],
+        final_details['Job URL'],
+        final_details['Notes']
+    ]
+
+
+def _remember_url(job_url: str, tracker_id: str) -> None:
+    """
+    Record the saved URL so later runs skip it as a duplicate
+    """
+    index = get_url_index()
+    if index is None:
+        return
+    try:
+        index.add(job_url, tracker_id)
+    except Exception as e:
+        print(f"Error updating URL index: {str(e)}")
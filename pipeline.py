@@ -0,0 +1,136 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from graph import create_job_tracker_graph
+
+# Pipeline stages and the graph steps each one runs
+STAGES = [
+    ("fetch", ["dedupe", "fetch"]),
+    ("parse", ["parse"]),
+    ("extract", ["extract"]),
+    ("save", ["prepare", "save"]),
+]
+
+_DONE = object()  # Queue sentinel: no more jobs for this stage
+
+
+@dataclass
+class Stage:
+    """
+    One stage of the pipeline: a partial graph and its pool of workers
+    """
+    name: str
+    steps: List[str]
+    workers: int
+    app: Any = None
+    busy_seconds: float = 0.0
+    jobs: int = 0
+    queue: Optional[asyncio.Queue] = field(default=None, repr=False)
+
+    def utilisation(self, elapsed: float) -> float:
+        """
+        Share of the stage's worker time spent working (not waiting on its queues)
+        """
+        if elapsed <= 0:
+            return 0.0
+        return self.busy_seconds / (self.workers * elapsed)
+
+
+class StagePipeline:
+    """
+    Runs jobs through the graph stage by stage, each stage with its own workers
+
+    Stages are connected by bounded queues: when a stage falls behind, its
+    queue fills up and the stage before it waits (backpressure), so jobs
+    never pile up in memory. Throughput is set by the slowest stage
+    rather than by one concurrency limit for the whole graph. Jobs that
+    are duplicates or fail leave the pipeline at the stage where that
+    happens.
+    """
+
+    def __init__(self, workers: Dict[str, int], queue_size: int = 10):
+        self.stages = [
+            Stage(name, steps, max(1, workers.get(name, 1)), create_job_tracker_graph(steps=steps))
+            for name, steps in STAGES
+        ]
+        self.queue_size = queue_size
+        self.elapsed = 0.0
+
+    async def run(self, job_urls: List[str], run_config: Optional[dict] = None) -> List[Any]:
+        """
+        Process every URL and return the final states in input order
+
+        A job whose stage raised (for example after running out of
+        retries) gets the exception in place of its state.
+        """
+        results: List[Any] = [None] * len(job_urls)
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=self.queue_size)
+
+        start_time = time.perf_counter()
+        tasks = [asyncio.create_task(self._feed(job_urls))]
+        for position, stage in enumerate(self.stages):
+            next_stage = self.stages[position + 1] if position + 1 < len(self.stages) else None
+            tasks.append(asyncio.create_task(self._run_stage(stage, next_stage, results, run_config)))
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.elapsed = time.perf_counter() - start_time
+
+        return results
+
+    async def _feed(self, job_urls: List[str]) -> None:
+        first = self.stages[0]
+        for index, url in enumerate(job_urls):
+            await first.queue.put((index, {"job_url": url}))
+        for _ in range(first.workers):
+            await first.queue.put(_DONE)
+
+    async def _run_stage(self, stage: Stage, next_stage: Optional[Stage], results: List[Any], run_config: Optional[dict]) -> None:
+        await asyncio.gather(*[
+            self._worker(stage, next_stage, results, run_config) for _ in range(stage.workers)
+        ])
+        # Every worker of this stage has finished: let the next stage wind down
+        if next_stage is not None:
+            for _ in range(next_stage.workers):
+                await next_stage.queue.put(_DONE)
+
+    async def _worker(self, stage: Stage, next_stage: Optional[Stage], results: List[Any], run_config: Optional[dict]) -> None:
+        while True:
+            item = await stage.queue.get()
+            if item is _DONE:
+                return
+
+            index, state = item
+            started = time.perf_counter()
+            try:
+                state = await stage.app.ainvoke(state, config=run_config)
+            except Exception as e:
+                results[index] = e
+                continue
+            finally:
+                stage.busy_seconds += time.perf_counter() - started
+                stage.jobs += 1
+
+            if next_stage is None or state.get("is_duplicate") or state.get("error_message"):
+                results[index] = state
+            else:
+                # Blocks while the next stage is backed up
+                await next_stage.queue.put((index, state))
+
+    def report(self) -> List[str]:
+        """
+        One summary line per stage: workers, jobs handled, time per job, utilisation
+        """
+        lines = []
+        for stage in self.stages:
+            per_job = stage.busy_seconds / stage.jobs if stage.jobs else 0.0
+            lines.append(
+                f"{stage.name:<8} {stage.workers:>3} workers, {stage.jobs:>5} jobs, "
+                f"{per_job:.2f}s/job, {stage.utilisation(self.elapsed):.0%} busy"
+            )
+        return lines
@@ -0,0 +1,241 @@
+"""
+Refresh mode: re-check the postings that are already in the tracker
+
+    python refresh.py                # one cycle over the postings that are due
+    python refresh.py --every 3600   # keep running, one cycle an hour
+    python refresh.py --status
+
+Each posting is fetched with a conditional GET. Pages that come back 304
+cost nothing more; other pages are parsed and the hash of their cleaned
+text is compared with the last one. Only postings whose text changed go
+through extract_details, and their rows are rewritten in one bulk update
+per cycle. Postings that answer 404 or 410 are marked closed in the
+refresh store (listed by --status); their rows are left as they are.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import config
+from nodes import parse_content, aextract_details, prepare_tracker_entry
+from utils.blob_store import get_blob_store, load_text
+from utils.body_reader import BodyReader
+from utils.http_client import get_async_http_client, aclose_http_clients
+from utils.metrics import record
+from utils.refresh_store import RefreshStore, TrackedPosting, open_refresh_store
+from utils.resilience import get_circuit_breaker, is_blocking_status, is_transient_status
+from utils.tracker_sink import TRACKER_COLUMNS, TrackerSink, get_tracker_sink
+
+# Columns rewritten when a posting changed; Date Added, Job URL and Notes are kept
+REFRESHED_COLUMNS = TRACKER_COLUMNS[:TRACKER_COLUMNS.index("Date Added")]
+
+# Statuses that mean the posting was taken down
+CLOSED_STATUSES = (404, 410)
+
+# A check's outcome: (kind, what to record for the posting, new column values for its row)
+Outcome = Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]
+
+
+class Refresher:
+    """
+    Runs refresh cycles over the tracked postings that are due for a check
+
+    A posting is due once REFRESH_INTERVAL seconds have passed since its
+    last check, so the tracker is spread over the interval instead of
+    being walked in full every cycle. The first check of a posting only
+    records its hash, since the row was extracted from the page when it
+    was saved.
+    """
+
+    def __init__(self, store: RefreshStore, sink: TrackerSink,
+                 max_concurrent: int = config.REFRESH_MAX_CONCURRENT, interval: float = config.REFRESH_INTERVAL):
+        self.store = store
+        self.sink = sink
+        self.max_concurrent = max_concurrent
+        self.interval = interval
+
+    async def run_cycle(self, limit: int = 0) -> Counter:
+        """
+        Check the postings that are due (at most limit) and update the rows that changed
+        """
+        added = self.store.sync_tracked(await asyncio.to_thread(self.sink.tracked_jobs))
+        if added:
+            print(f"Tracking {added} new postings")
+        postings = self.store.due(self.interval, limit)
+        print(f"Checking {len(postings)} postings...")
+
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def limited_check(posting: TrackedPosting) -> Outcome:
+            async with semaphore:
+                return await self._check(posting)
+
+        try:
+            outcomes = await asyncio.gather(*[limited_check(posting) for posting in postings])
+        finally:
+            await aclose_http_clients()
+
+        counts = Counter(kind for kind, _, _ in outcomes)
+        updates = {
+            posting.tracker_id: columns
+            for posting, (_, _, columns) in zip(postings, outcomes) if columns
+        }
+        results = {
+            posting.key: values
+            for posting, (kind, values, _) in zip(postings, outcomes) if kind != "failed"
+        }
+        if updates:
+            try:
+                await asyncio.to_thread(self.sink.update_rows, updates)
+                print(f"Updated {len(updates)} rows in {self.sink.name}")
+            except Exception as e:
+                # Keep the old hashes so the next cycle tries these rows again
+                print(f"Error updating {self.sink.name}: {str(e)}")
+                for posting, (_, _, columns) in zip(postings, outcomes):
+                    if columns:
+                        results.pop(posting.key, None)
+                counts["update_failed"] += len(updates)
+        changed = [
+            posting.key for posting, (kind, _, _) in zip(postings, outcomes)
+            if kind in ("changed", "closed") and posting.key in results
+        ]
+        self.store.record(results, changed)
+        return counts
+
+    async def _check(self, posting: TrackedPosting) -> Outcome:
+        try:
+            breaker = get_circuit_breaker(posting.url)
+            if not breaker.allow():
+                return "failed", {}, None
+
+            headers = {}
+            if posting.etag:
+                headers["If-None-Match"] = posting.etag
+            if posting.last_modified:
+                headers["If-Modified-Since"] = posting.last_modified
+
+            client = get_async_http_client(posting.url)
+            async with client.stream("GET", posting.url, headers=headers) as response:
+                record("http_requests")
+                if is_blocking_status(response.status_code):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                body = None
+                if response.status_code == 200:
+                    reader = BodyReader(posting.url, response.encoding)
+                    async for chunk in response.aiter_bytes():
+                        if reader.feed(chunk):
+                            break
+                    body = reader.text()
+                    record("bytes", reader.bytes_read)
+
+            if response.status_code == 304:
+                return "not_modified", {}, None
+            if response.status_code in CLOSED_STATUSES:
+                print(f"Posting closed (HTTP {response.status_code}): {posting.url}")
+                return "closed", {"status": "closed"}, None
+            if response.status_code != 200:
+                if not is_transient_status(response.status_code):
+                    print(f"Failed to refresh {posting.url}: HTTP {response.status_code}")
+                return "failed", {}, None
+
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            return await self._compare(posting, body, validators)
+
+        except Exception as e:
+            print(f"Error refreshing {posting.url}: {str(e)}")
+            return "failed", {}, None
+
+    async def _compare(self, posting: TrackedPosting, body: str, validators: Dict[str, Any]) -> Outcome:
+        """
+        Parse the page, compare its text hash and extract it again if it changed
+        """
+        parsed = await asyncio.to_thread(parse_content, {"job_url": posting.url, "raw_html": body})
+        text = load_text(parsed, "parsed_content")
+        if parsed.get("error_message") or not text:
+            return "failed", {}, None
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        if content_hash == posting.content_hash or posting.content_hash is None:
+            if parsed.get("parsed_content_ref"):
+                get_blob_store().release(parsed["parsed_content_ref"])
+            kind = "unchanged" if posting.content_hash else "baseline"
+            return kind, {**validators, "content_hash": content_hash}, None
+
+        print(f"Posting changed: {posting.url}")
+        extracted = await aextract_details({"job_url": posting.url, **parsed})
+        if not extracted.get("extracted_details"):
+            return "failed", {}, None
+        prepared = prepare_tracker_entry({"job_url": posting.url, **extracted})
+        if not prepared.get("final_details"):
+            return "failed", {}, None
+        columns = {name: prepared["final_details"][name] for name in REFRESHED_COLUMNS}
+        return "changed", {**validators, "content_hash": content_hash}, columns
+
+
+def print_status(store: RefreshStore, as_json: bool = False) -> None:
+    status = store.status(config.REFRESH_INTERVAL)
+    if as_json:
+        closed = [{"url": url, "row": tracker_id, "closed_at": closed_at} for url, tracker_id, closed_at in store.closed()]
+        print(json.dumps({**status, "recently_closed": closed}, indent=2))
+        return
+    print(f"Open postings: {status['open']} ({status['due']} due for a check, {status['never_checked']} never checked)")
+    print(f"Closed postings: {status['closed']}")
+    if status["last_check"]:
+        print(f"Last check: {_format_time(status['last_check'])}")
+
+    closed = store.closed()
+    if closed:
+        print("\nRecently closed:")
+        for url, tracker_id, closed_at in closed:
+            print(f"  row {tracker_id}: {url} ({_format_time(closed_at)})")
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def print_cycle(counts: Counter, seconds: float) -> None:
+    summary = ", ".join(f"{count} {kind.replace('_', ' ')}" for kind, count in sorted(counts.items()))
+    print(f"Refresh cycle done in {seconds:.1f} seconds: {summary or 'nothing due'}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-check tracked job postings and update the rows that changed")
+    parser.add_argument("--every", type=float, metavar="SECONDS", help="Repeat the cycle every SECONDS (default: run once)")
+    parser.add_argument("--limit", type=int, default=0, help="Postings checked per cycle at most (0 = all that are due)")
+    parser.add_argument("--max-concurrent", type=int, default=config.REFRESH_MAX_CONCURRENT,
+                        help="Postings checked at the same time")
+    parser.add_argument("--status", action="store_true", help="Show refresh progress and exit")
+    parser.add_argument("--json", action="store_true", help="Print --status as JSON")
+    args = parser.parse_args(argv)
+    if args.max_concurrent < 1:
+        parser.error("--max-concurrent must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    store = open_refresh_store()
+
+    if args.status:
+        print_status(store, args.json)
+    else:
+        refresher = Refresher(store, get_tracker_sink(), args.max_concurrent)
+        try:
+            while True:
+                start_time = time.time()
+                print_cycle(asyncio.run(refresher.run_cycle(args.limit)), time.time() - start_time)
+                if not args.every:
+                    break
+                time.sleep(max(0.0, args.every - (time.time() - start_time)))
+        except KeyboardInterrupt:
+            print("\nRefresh stopped")
@@ -9,12 +9,18 @@ class JobTrackerState(TypedDict, total=False):
     # Input (what we start with)
     job_url: str
     
+    # After the duplicate check
+    is_duplicate: Optional[bool]  # Already in the tracker?
+    
     # After fetching the webpage
     raw_html: Optional[str]  # Optional because it doesn't exist at start
+    raw_html_ref: Optional[str]  # Blob reference instead of raw_html in lean-state mode
     fetch_status: Optional[str]  # "success" or "failed"
     
     # After parsing
     parsed_content: Optional[str]  # Cleaned text from HTML
+    parsed_content_ref: Optional[str]  # Blob reference instead of parsed_content in lean-state mode
+    structured_details: Optional[Dict[str, Any]]  # Fields found in JSON-LD/OpenGraph metadata
     
     # After extraction
     extracted_details: Optional[Dict[str, Any]]  # Dict with job info
@@ -0,0 +1,37 @@
+"""
+Local tracker maintenance (TRACKER_SINK=local or mirror)
+
+    python tracker.py status
+    python tracker.py sync              # push rows that aren't in the sheet yet
+    python tracker.py export jobs.parquet
+"""
+import argparse
+import json
+from typing import List, Optional
+import config
+from utils.tracker_sink import LocalSink, MirroredSink, tracker_status
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect, sync and export the local job tracker")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show row counts")
+    commands.add_parser("sync", help="Copy rows that aren't in the Google Sheet yet")
+    export_parser = commands.add_parser("export", help="Write all rows to a file")
+    export_parser.add_argument("path", help="Output file: .parquet for Parquet, anything else for CSV")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    local = LocalSink(config.TRACKER_DB_PATH)
+
+    if args.command == "status":
+        sink = MirroredSink(local) if config.TRACKER_SINK == "mirror" else local
+        print(json.dumps(tracker_status(sink), indent=2))
+    elif args.command == "sync":
+        mirror = MirroredSink(local, sync_batch=config.TRACKER_SYNC_BATCH)
+        pushed = mirror.sync_all()
+        print(f"Synced {pushed} rows to Google Sheets ({local.unsynced()} left)")
+    elif args.command == "export":
+        print(f"Exported {local.export(args.path)} rows to {args.path}")
@@ -1,3 +1,10 @@
-from .content_cleaner import clean_content_by_site
+from .content_cleaner import clean_content_by_site, register_site_rule, get_site_rule
+from .http_client import get_http_client, get_async_http_client
 
-__all__ = ['clean_content_by_site']
\ No newline at end of file
+__all__ = [
+    'clean_content_by_site',
+    'register_site_rule',
+    'get_site_rule',
+    'get_http_client',
+    'get_async_http_client'
+]
@@ -0,0 +1,112 @@
+import asyncio
+import functools
+import os
+import tempfile
+import uuid
+from typing import Any, Dict, Optional
+import config
+from config import runtime_option
+
+
+class BlobStore:
+    """
+    Spill store for large text payloads (raw HTML, parsed text)
+
+    Each blob is a file in one directory; graph state only carries the
+    short reference. Blobs are deleted as soon as they are released.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, text: str) -> str:
+        ref = uuid.uuid4().hex
+        path = self._path(ref)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)
+        return ref
+
+    def get(self, ref: str) -> str:
+        with open(self._path(ref), encoding="utf-8") as f:
+            return f.read()
+
+    def release(self, ref: str) -> None:
+        try:
+            os.remove(self._path(ref))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.directory, f"{ref}.blob")
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        _store = BlobStore(config.BLOB_DIR or os.path.join(tempfile.gettempdir(), "job-tracker-blobs"))
+    return _store
+
+
+def lean_state_enabled() -> bool:
+    return bool(runtime_option("lean_state", config.LEAN_STATE))
+
+
+def store_text(field: str, text: str) -> Dict[str, Any]:
+    """
+    State update for a large text field: the text itself, or in lean-state
+    mode a reference to it under "<field>_ref"
+    """
+    if lean_state_enabled():
+        return {f"{field}_ref": get_blob_store().put(text)}
+    return {field: text}
+
+
+def load_text(state: Dict[str, Any], field: str) -> Optional[str]:
+    """
+    Read a large text field from state, following a blob reference if needed
+    """
+    if state.get(field):
+        return state[field]
+    ref = state.get(f"{field}_ref")
+    if ref:
+        try:
+            return get_blob_store().get(ref)
+        except FileNotFoundError:
+            return None
+    return None
+
+
+def releases(field: str):
+    """
+    Decorator for the node that consumes a large text field
+
+    Once the node has returned, the field's blob is deleted and its
+    reference cleared from state. Nodes that raise (and may be retried)
+    keep the blob, and so do nodes that report an error in a checkpointed
+    run, where a resumed run will try them again.
+    """
+    def decorator(node):
+        def release(state, result):
+            ref = state.get(f"{field}_ref")
+            retry_later = isinstance(result, dict) and result.get("error_message") and runtime_option("thread_id")
+            if ref and isinstance(result, dict) and not retry_later:
+                get_blob_store().release(ref)
+                result = {**result, f"{field}_ref": None}
+            return result
+
+        if asyncio.iscoroutinefunction(node):
+            @functools.wraps(node)
+            async def async_wrapper(state):
+                return release(state, await node(state))
+            return async_wrapper
+
+        @functools.wraps(node)
+        def wrapper(state):
+            return release(state, node(state))
+        return wrapper
+    return decorator
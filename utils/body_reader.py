@@ -0,0 +1,100 @@
+import codecs
+from typing import List, Optional
+import config
+from utils.content_cleaner import get_site_rule
+from utils.html_text import html_to_text
+
+
+class BodyReader:
+    """
+    Incrementally decodes a streamed page body and decides when to stop reading
+
+    Reading stops at max_bytes, or - when early_stop is on and the site has
+    a cleaning rule - as soon as one of the site's cutoff phrases ("Similar
+    jobs", ...) shows up in the page text, since everything after it would
+    be cleaned away anyway.
+    """
+
+    def __init__(self, url: str, encoding: Optional[str], max_bytes: int = None, early_stop: bool = None):
+        self.max_bytes = max_bytes if max_bytes is not None else config.FETCH_MAX_BYTES
+        early_stop = config.FETCH_EARLY_STOP if early_stop is None else early_stop
+        self.rule = get_site_rule(url) if early_stop else None
+        self.bytes_read = 0
+        self.truncated = False
+        self._decoder = _incremental_decoder(encoding)
+        self._parts: List[str] = []
+        self._length = 0  # Characters decoded so far
+        self._tail = ""  # End of the previous text, so phrases split across chunks are found
+        self._in_body = False
+        self._overlap = max((len(p) for p in self.rule.cutoff_phrases), default=0) if self.rule else 0
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Add a chunk; returns True when the rest of the body should not be read
+        """
+        remaining = self.max_bytes - self.bytes_read
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            self.truncated = True
+        self.bytes_read += len(chunk)
+
+        text = self._decoder.decode(chunk)
+        self._parts.append(text)
+        self._length += len(text)
+
+        if self.rule is not None and self._find_cutoff(text):
+            self.truncated = True
+            return True
+
+        if self.bytes_read >= self.max_bytes:
+            self.truncated = True
+            return True
+        return False
+
+    def text(self) -> str:
+        if not self.truncated:
+            self._parts.append(self._decoder.decode(b"", final=True))
+        return "".join(self._parts)
+
+    def _find_cutoff(self, text: str) -> bool:
+        window = self._tail + text
+        window_start = self._length - len(window)
+        self._tail = window[-max(self._overlap, len("<body")):]
+
+        search_from = 0
+        if not self._in_body:
+            search_from = window.find("<body")
+            if search_from < 0:
+                return False
+            self._in_body = True
+
+        for match in self.rule.pattern.finditer(window, search_from):
+            html = "".join(self._parts)
+            self._parts = [html]
+            position = window_start + match.start()
+            if self._in_visible_text(html, position, window_start + match.end()):
+                self._parts = [html[:position]]
+                return True
+        return False
+
+    def _in_visible_text(self, html: str, start: int, end: int) -> bool:
+        """
+        Is the match at html[start:end] part of the text parse_content keeps?
+
+        Matches inside a tag or script are ruled out cheaply. The rest are
+        confirmed on the text of the page so far, which leaves out header,
+        nav, footer, style, template and comment contents like parse_content
+        does, so reading only stops where the site cleaner would cut.
+        """
+        if html.rfind("<", 0, start) > html.rfind(">", 0, start):
+            return False
+        if html.rfind("<script", 0, start) > html.rfind("</script", 0, start):
+            return False
+        return self.rule.pattern.search(html_to_text(html[:end])) is not None
+
+
+def _incremental_decoder(encoding: Optional[str]):
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
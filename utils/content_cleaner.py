@@ -1,127 +1,116 @@
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern
+from urllib.parse import urlsplit
 import re
 
-def clean_content_by_site(content: str, url: str) -> str:
+
+@dataclass
+class SiteRule:
     """
-    Clean parsed content based on the job site
-    
-    Args:
-        content: The parsed text content
-        url: The job posting URL (to detect which site)
-    
-    Returns:
-        Cleaned content with irrelevant sections removed
+    Cleaning rule for one job site
+
+    Everything from the earliest cutoff phrase onwards (similar jobs,
+    job alerts, ...) is dropped. The phrases are compiled into a single
+    regex so a page is scanned once however many phrases there are.
     """
-    
-    # Detect which site we're dealing with
-    if 'linkedin.com' in url:
-        return clean_linkedin_content(content)
-    elif 'indeed.com' in url:
-        return clean_indeed_content(content)
-    elif 'glassdoor.com' in url:
-        return clean_glassdoor_content(content)
-    else:
-        # Generic cleaning for unknown sites
-        return clean_generic_content(content)
-
-
-def clean_linkedin_content(content: str) -> str:
+    domain: str
+    cutoff_phrases: List[str]
+    pattern: Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.pattern = re.compile('|'.join(re.escape(phrase) for phrase in self.cutoff_phrases))
+
+    def cut(self, content: str) -> str:
+        match = self.pattern.search(content)
+        if match:
+            content = content[:match.start()]
+        return content.strip()
+
+
+# Site rules keyed by domain; subdomains (www., uk., ...) match their parent domain
+SITE_RULES: Dict[str, SiteRule] = {}
+
+
+def register_site_rule(domain: str, cutoff_phrases: List[str]) -> SiteRule:
     """
-    Clean LinkedIn-specific content
+    Add (or replace) the cleaning rule for a job site
     """
-    # Find the cutoff point
-    cutoff_phrases = [
-        "Sign in to create job alert",
-        "Create job alert",
-        "Similar jobs",
-        "People also viewed",
-        "Show more jobs like this"
-    ]
-    
-    # Find the earliest occurrence of any cutoff phrase
-    earliest_index = len(content)
-    found_phrase = None
-    
-    for phrase in cutoff_phrases:
-        index = content.find(phrase)
-        if index != -1 and index < earliest_index:
-            earliest_index = index
-            found_phrase = phrase
-    
-    # Cut content if we found a cutoff phrase
-    if found_phrase:
-        content = content[:earliest_index]
-    
-    return content.strip()
+    rule = SiteRule(domain.lower(), list(cutoff_phrases))
+    SITE_RULES[rule.domain] = rule
+    return rule
 
 
-def clean_indeed_content(content: str) -> str:
+register_site_rule('linkedin.com', [
+    "Sign in to create job alert",
+    "Create job alert",
+    "Similar jobs",
+    "People also viewed",
+    "Show more jobs like this"
+])
+
+register_site_rule('indeed.com', [
+    "Report job",
+    "Not interested",
+    "People also searched",
+    "Jobs you might be interested in"
+])
+
+register_site_rule('glassdoor.com', [
+    "Sign In to see similar jobs",
+    "Jobs You Might Like",
+    "Similar Jobs"
+])
+
+# Footer/navigation lines removed on unknown sites: from the match to the end of the line
+GENERIC_PATTERNS = [
+    r'Follow us on',
+    r'Subscribe to',
+    r'Copyright \d{4}',
+    r'Privacy Policy',
+    r'Terms of Service'
+]
+
+_generic_pattern = re.compile(
+    '(?:' + '|'.join(GENERIC_PATTERNS) + ').*',
+    flags=re.IGNORECASE
+)
+
+
+def get_site_rule(url: str) -> Optional[SiteRule]:
     """
-    Clean Indeed-specific content
+    Find the rule for a URL's host (www.linkedin.com -> linkedin.com)
     """
-    cutoff_phrases = [
-        "Report job",
-        "Not interested",
-        "People also searched",
-        "Jobs you might be interested in"
-    ]
-    
-    earliest_index = len(content)
-    found_phrase = None
-    
-    for phrase in cutoff_phrases:
-        index = content.find(phrase)
-        if index != -1 and index < earliest_index:
-            earliest_index = index
-            found_phrase = phrase
-    
-    if found_phrase:
-        content = content[:earliest_index]
-    
-    return content.strip()
+    labels = (urlsplit(url).hostname or '').lower().split('.')
+    for i in range(len(labels) - 1):
+        rule = SITE_RULES.get('.'.join(labels[i:]))
+        if rule is not None:
+            return rule
+    return None
 
 
-def clean_glassdoor_content(content: str) -> str:
-    """
-    Clean Glassdoor-specific content
+def clean_content_by_site(content: str, url: str) -> str:
     """
-    cutoff_phrases = [
-        "Sign In to see similar jobs",
-        "Jobs You Might Like",
-        "Similar Jobs"
-    ]
-    
-    earliest_index = len(content)
-    found_phrase = None
+    Clean parsed content based on the job site
     
-    for phrase in cutoff_phrases:
-        index = content.find(phrase)
-        if index != -1 and index < earliest_index:
-            earliest_index = index
-            found_phrase = phrase
+    Args:
+        content: The parsed text content
+        url: The job posting URL (to detect which site)
     
-    if found_phrase:
-        content = content[:earliest_index]
+    Returns:
+        Cleaned content with irrelevant sections removed
+    """
+    rule = get_site_rule(url)
+    if rule is not None:
+        return rule.cut(content)
     
-    return content.strip()
+    # Generic cleaning for unknown sites
+    return clean_generic_content(content)
 
 
 def clean_generic_content(content: str) -> str:
     """
     Generic cleaning for unknown sites
     
-    Removes common footer/navigation patterns
+    Removes common footer/navigation patterns in one pass
     """
-    # Common patterns to remove
-    patterns = [
-        r'Follow us on.*',
-        r'Subscribe to.*',
-        r'Copyright \d{4}.*',
-        r'Privacy Policy.*',
-        r'Terms of Service.*'
-    ]
-    
-    for pattern in patterns:
-        content = re.sub(pattern, '', content, flags=re.IGNORECASE)
-    
-    return content.strip()
\ No newline at end of file
+    return _generic_pattern.sub('', content).strip()
@@ -0,0 +1,156 @@
+import re
+from dataclasses import dataclass
+from typing import List
+from utils.tokens import count_tokens, truncate_to_tokens
+
+# Heading keywords and how useful their sections are for extraction
+HEADING_WEIGHTS = [
+    (re.compile(r'requirement|qualification|what you(?:\'ll)? need|must have|skills|experience', re.I), 5.0),
+    (re.compile(r'compensation|salary|pay\b|pay range|benefits', re.I), 5.0),
+    (re.compile(r'location|remote|hybrid|on-?site|workplace', re.I), 4.0),
+    (re.compile(r'job type|employment type|schedule|seniority', re.I), 4.0),
+    (re.compile(r'responsibilit|what you(?:\'ll)? do|the role|about the (?:job|position)|overview', re.I), 2.0),
+    (re.compile(r'about (?:us|the company)|who we are|our mission', re.I), 0.5),
+    (re.compile(r'equal opportunit|eeo|privacy|cookie|accommodation|disclaimer', re.I), -5.0),
+]
+
+# Words and patterns that carry the fields we extract
+FIELD_KEYWORDS = re.compile(
+    r'\$|€|£|salary|per (?:year|hour|annum)|\d+\+? years?|experience|full[- ]time|part[- ]time|'
+    r'contract|intern|remote|hybrid|on-?site|location|deadline|apply by|posted|skills?|degree|'
+    r'python|java|sql|aws|cloud',
+    re.I
+)
+
+BOILERPLATE = re.compile(
+    r'equal opportunity|without regard to|reasonable accommodation|privacy policy|cookies?|'
+    r'sign in|join now|by clicking',
+    re.I
+)
+
+OMITTED_MARKER = "\n\n[Less relevant sections omitted...]"
+
+
+@dataclass
+class Section:
+    index: int
+    text: str
+    tokens: int
+    score: float
+
+
+def select_relevant_content(content: str, token_budget: int) -> str:
+    """
+    Pick the parts of a posting that matter for extraction, within a token budget
+
+    The text is split into sections at heading-like lines. Each section is
+    scored by its heading (Requirements, Compensation, Location, ...) and
+    the density of field keywords; boilerplate (EEO statements, sign-in
+    prompts) scores below zero and is always dropped. The best sections
+    are packed into the budget and returned in their original order. A
+    section too big to fit whole is cut to the budget that is left: the
+    opening section when it alone exceeds the budget, or the best section
+    that didn't fit once no other section does.
+    """
+    sections = _split_sections(content)
+    if not sections:
+        return content
+
+    kept = [s for s in sections if s.score >= 0]
+    if sum(s.tokens for s in kept) <= token_budget:
+        selected = kept
+    else:
+        selected = []
+        skipped = []
+        remaining = token_budget
+        # The opening section usually carries title, company and location
+        for section in sorted(kept, key=lambda s: (s.index != 0, -s.score)):
+            if section.tokens <= remaining:
+                selected.append(section)
+                remaining -= section.tokens
+            elif not selected:
+                # Even the best section alone is too big: keep the start of it,
+                # leaving room for the other sections (it gets at least half)
+                others = sum(s.tokens for s in kept if s is not section)
+                selected.append(_trimmed(section, max(remaining - others, remaining // 2)))
+                remaining -= selected[-1].tokens
+            else:
+                skipped.append(section)
+
+        if skipped and remaining > 0:
+            # Fill the rest of the budget with the start of the best section that didn't fit
+            partial = _trimmed(skipped[0], remaining)
+            if partial.text.strip():
+                selected.append(partial)
+
+    selected.sort(key=lambda s: s.index)
+    result = "\n".join(s.text for s in selected)
+    if len(selected) < len(sections) or any(s.text != sections[s.index].text for s in selected):
+        result += OMITTED_MARKER
+    return result
+
+
+def _split_sections(content: str) -> List[Section]:
+    chunks: List[List[str]] = []
+    for line in content.splitlines():
+        if not chunks or _is_heading(line):
+            chunks.append([line])
+        else:
+            chunks[-1].append(line)
+
+    sections = []
+    for index, lines in enumerate(chunks):
+        text = "\n".join(lines)
+        tokens = count_tokens(text)
+        sections.append(Section(index, text, tokens, _score(lines, tokens, index)))
+    return sections
+
+
+def _is_heading(line: str) -> bool:
+    line = line.strip()
+    if not line or len(line) > 60 or line.endswith(('.', ',')):
+        return False
+    if line.endswith(':'):
+        return True
+    return any(pattern.search(line) for pattern, _ in HEADING_WEIGHTS) and len(line.split()) <= 6
+
+
+def _score(lines: List[str], tokens: int, index: int) -> float:
+    heading = lines[0]
+    score = 0.0
+    for pattern, weight in HEADING_WEIGHTS:
+        if pattern.search(heading) and _is_heading(heading):
+            score = weight
+            break
+
+    body = "\n".join(lines)
+    keyword_density = len(FIELD_KEYWORDS.findall(body)) / max(tokens, 1)
+    boilerplate_density = len(BOILERPLATE.findall(body)) / max(tokens, 1)
+    score += 20 * keyword_density - 40 * boilerplate_density
+
+    if index == 0:
+        score = max(score, 0) + 10
+    return score
+
+
+def _trimmed(section: Section, token_budget: int) -> Section:
+    text = _trim_to_tokens(section.text, token_budget)
+    return Section(section.index, text, count_tokens(text), section.score)
+
+
+def _trim_to_tokens(text: str, token_budget: int) -> str:
+    """
+    Whole lines while they fit, then as much of the next line as fits
+    """
+    lines = []
+    used = 0
+    for line in text.splitlines():
+        tokens = count_tokens(line) + 1
+        if used + tokens > token_budget:
+            partial = truncate_to_tokens(line, token_budget - used - 1)
+            if partial:
+                lines.append(partial)
+            break
+        lines.append(line)
+        used += tokens
+    return "\n".join(lines)
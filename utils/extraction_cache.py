@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+import config
+from utils.sqlite_store import connect
+
+# Bump when the shape of cached results changes; older rows are dropped on open
+CACHE_VERSION = 1
+
+
+def extraction_cache_key(model: str, system_prompt: str, content: str) -> str:
+    """
+    Hash of everything that determines the LLM's answer
+
+    A new prompt or model gives a new key, so stale answers are never reused.
+    """
+    digest = hashlib.sha256()
+    for part in (str(CACHE_VERSION), model, system_prompt, content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent cache of LLM extraction results keyed by content hash
+
+    Entries unused for longer than the TTL are expired and the table is kept
+    under max_entries by evicting the least recently used rows.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                model TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS extractions_lru ON extractions (accessed_at)")
+        self._conn.execute("DELETE FROM extractions WHERE version != ?", (CACHE_VERSION,))
+        self._conn.execute("DELETE FROM extractions WHERE accessed_at < ?", (time.time() - ttl,))
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, accessed_at FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE extractions SET accessed_at = ? WHERE key = ?", (now, key))
+            self._stats["hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, result: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, CACHE_VERSION, model, json.dumps(result), now, now)
+            )
+            self._conn.execute(
+                """DELETE FROM extractions WHERE key IN (
+                       SELECT key FROM extractions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {key: 0 for key in self._stats}
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    Get the process-wide extraction cache, or None when EXTRACTION_CACHE_ENABLED is off
+    """
+    global _cache
+    if not config.EXTRACTION_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache(
+                config.EXTRACTION_CACHE_PATH,
+                max_entries=config.EXTRACTION_CACHE_MAX_ENTRIES,
+                ttl=config.EXTRACTION_CACHE_TTL_DAYS * 86400
+            )
+        return _cache
@@ -0,0 +1,80 @@
+from typing import List
+from lxml import etree
+
+# Elements dropped together with everything inside them (same as parse_content)
+SKIP_TAGS = {'script', 'style', 'nav', 'footer', 'header'}
+
+# BeautifulSoup's get_text() leaves out text inside these as well
+NON_TEXT_TAGS = {'template', 'rt', 'rp'}
+
+
+class _TextCollector:
+    """
+    lxml parser target that turns parse events straight into text lines
+
+    No tree is built: unwanted elements are skipped while parsing and each
+    text node is stripped and split into lines as soon as it is complete.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self._text: List[str] = []
+        self._skip_depth = 0
+        self._non_text_depth = 0
+
+    def start(self, tag, attrib, nsmap=None):
+        self._end_text()
+        if self._skip_depth or tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in NON_TEXT_TAGS:
+            self._non_text_depth += 1
+
+    def end(self, tag):
+        self._end_text()
+        if self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in NON_TEXT_TAGS:
+            self._non_text_depth -= 1
+
+    def data(self, data):
+        if not self._skip_depth and not self._non_text_depth:
+            self._text.append(data)
+
+    def comment(self, text):
+        self._end_text()
+
+    def pi(self, target, data=None):
+        self._end_text()
+
+    def doctype(self, *args):
+        self._end_text()
+
+    def close(self):
+        self._end_text()
+        return self.lines
+
+    def _end_text(self):
+        if not self._text:
+            return
+        text = ''.join(self._text).strip()
+        self._text = []
+        if text:
+            for line in text.splitlines():
+                line = line.strip()
+                if line:
+                    self.lines.append(line)
+
+
+def html_to_text(html: str) -> str:
+    """
+    Extract visible text from HTML in one streaming pass
+
+    Gives the same result as BeautifulSoup(html, 'lxml') with script, style,
+    nav, footer and header removed, followed by get_text('\\n', strip=True)
+    and dropping blank lines - without building the soup tree.
+    """
+    if html and html[0] == '\ufeff':  # Byte order mark, as BeautifulSoup drops it
+        html = html[1:]
+    parser = etree.HTMLParser(target=_TextCollector(), strip_cdata=False, recover=True)
+    parser.feed(html)
+    return '\n'.join(parser.close())
@@ -0,0 +1,162 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import config
+from utils.sqlite_store import connect
+from utils.url_utils import canonicalize_url
+
+
+@dataclass
+class CachedResponse:
+    """
+    A job page stored in the HTTP cache
+    """
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class HttpCache:
+    """
+    Disk-backed response cache for job pages
+
+    Entries are keyed by canonical URL. Fresh entries (younger than the TTL)
+    are served without touching the network; stale ones are revalidated with
+    If-None-Match / If-Modified-Since so unchanged pages come back as 304s.
+    Total body size is capped and the least recently used pages are evicted.
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        self._stats = {"hits": 0, "misses": 0, "revalidations": 0}
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """
+        Get the cached response for a URL (fresh or stale), or None
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), key)
+            )
+        return CachedResponse(key, row[0], row[1], row[2], row[3])
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.fetched_at < self.ttl
+
+    def conditional_headers(self, entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """
+        Request headers that let the server answer 304 Not Modified
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        Save a freshly downloaded page and evict old pages if over the size cap
+        """
+        key = canonicalize_url(url)
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE url = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now, size)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._evict()
+
+    def mark_revalidated(self, entry: CachedResponse, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        A 304 came back: the cached body is still current, restart its TTL
+        """
+        with self._lock:
+            self._conn.execute(
+                """UPDATE responses
+                   SET fetched_at = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                   WHERE url = ?""",
+                (time.time(), etag, last_modified, entry.url)
+            )
+
+    def record(self, outcome: str) -> None:
+        """
+        Count a "hits", "misses" or "revalidations" outcome
+        """
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {key: 0 for key in self._stats}
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT url, size FROM responses ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._total_bytes = 0
+                return
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (row[0],))
+            self._total_bytes -= row[1]
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """
+    Get the process-wide HTTP cache, or None when HTTP_CACHE_ENABLED is off
+    """
+    global _cache
+    if not config.HTTP_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(
+                config.HTTP_CACHE_PATH,
+                ttl=config.HTTP_CACHE_TTL,
+                max_bytes=config.HTTP_CACHE_MAX_MB * 1024 * 1024
+            )
+        return _cache
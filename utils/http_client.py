@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import weakref
+from typing import Dict
+from urllib.parse import urlsplit
+import httpx
+import config
+
+# One pooled client per host, so every host gets its own connection limit
+_clients: Dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+
+# Async clients are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+_http2_checked = False
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """
+    Get the process-wide keep-alive client for the host of a URL
+    """
+    host = _host_of(url)
+    with _clients_lock:
+        client = _clients.get(host)
+        if client is None:
+            client = httpx.Client(**_client_options(host))
+            _clients[host] = client
+        return client
+
+
+def get_async_http_client(url: str) -> httpx.AsyncClient:
+    """
+    Get the keep-alive async client for the host of a URL on the running event loop
+    """
+    host = _host_of(url)
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get(host)
+    if client is None:
+        client = httpx.AsyncClient(**_client_options(host))
+        clients[host] = client
+    return client
+
+
+def close_http_clients() -> None:
+    """
+    Close all sync clients (their pooled connections are dropped)
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose_http_clients() -> None:
+    """
+    Close all async clients that belong to the running event loop
+    """
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def pool_size_for_host(host: str) -> int:
+    """
+    Connection limit for a host, using the most specific HTTP_HOST_POOL_SIZES entry
+    """
+    labels = host.split(".")
+    for i in range(len(labels)):
+        size = config.HTTP_HOST_POOL_SIZES.get(".".join(labels[i:]))
+        if size is not None:
+            return size
+    return config.HTTP_POOL_SIZE
+
+
+def _client_options(host: str) -> dict:
+    pool_size = pool_size_for_host(host)
+    return {
+        "http2": _http2_enabled(),
+        "follow_redirects": True,
+        "timeout": httpx.Timeout(
+            config.HTTP_READ_TIMEOUT,
+            connect=config.HTTP_CONNECT_TIMEOUT
+        ),
+        "limits": httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY
+        ),
+    }
+
+
+def _http2_enabled() -> bool:
+    """
+    HTTP/2 is opt-in and needs the "h2" package; fall back to HTTP/1.1 without it
+    """
+    global _http2_checked
+    if not config.HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        if not _http2_checked:
+            print("HTTP2 is enabled but the 'h2' package is missing, using HTTP/1.1")
+            _http2_checked = True
+        return False
+
+
+def _host_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import config
+from utils.sqlite_store import connect
+from utils.url_utils import canonicalize_url
+
+STATUSES = ("queued", "running", "done", "failed")
+
+
+class JobQueue:
+    """
+    Durable queue of job URLs shared by worker processes through a SQLite file
+
+    Jobs are keyed by canonical URL, so the same posting is only queued
+    once. A worker claims jobs with a lease of visibility_timeout seconds
+    and extends it while the job runs; if the worker dies, the lease runs
+    out and another worker picks the job up again. Jobs that were claimed
+    max_attempts times without finishing are marked failed.
+    """
+
+    def __init__(self, path: str, wal: bool = True):
+        self._lock = threading.Lock()
+        self._conn = connect(path, wal=wal)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                enqueued_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                result TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, enqueued_at)")
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        Queue URLs that aren't queued yet and return how many were added
+        """
+        now = time.time()
+        rows = {canonicalize_url(url): url for url in urls if url}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (key, url, status, enqueued_at, updated_at) VALUES (?, ?, 'queued', ?, ?)",
+                    [(key, url, now, now) for key, url in rows.items()]
+                )
+                added = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def claim(self, worker: str, limit: int, visibility_timeout: float,
+              max_attempts: int = 0) -> List[Tuple[str, str, int]]:
+        """
+        Lease up to limit jobs to a worker: queued ones first, then ones whose
+        lease ran out. Returns (key, url, attempt) for each claimed job.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if max_attempts:
+                    # Jobs that keep taking their worker down are given up on
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'failed', worker = NULL, lease_until = NULL, updated_at = ?, result = ? "
+                        "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                        (now, json.dumps({"error": f"Gave up after {max_attempts} attempts"}), now, max_attempts)
+                    )
+                rows = self._conn.execute(
+                    "SELECT key, url, attempts FROM jobs "
+                    "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY status = 'running', enqueued_at LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE key = ?",
+                    [(worker, now + visibility_timeout, now, key) for key, _, _ in rows]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(key, url, attempts + 1) for key, url, attempts in rows]
+
+    def extend(self, worker: str, keys: Iterable[str], visibility_timeout: float) -> None:
+        """
+        Renew the leases a worker still holds (its heartbeat)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE jobs SET lease_until = ? WHERE key = ? AND worker = ? AND status = 'running'",
+                    [(now + visibility_timeout, key, worker) for key in keys]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def complete(self, key: str, worker: str, status: str, result: Dict[str, Any]) -> bool:
+        """
+        Record a finished job, unless its lease was lost to another worker
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE key = ? AND worker = ? AND status = 'running'",
+                (status, json.dumps(result), time.time(), key, worker)
+            )
+        return cursor.rowcount == 1
+
+    def release(self, worker: str) -> int:
+        """
+        Put every job a worker still holds back in the queue (on shutdown)
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, lease_until = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE worker = ? AND status = 'running'",
+                (time.time(), worker)
+            )
+        return cursor.rowcount
+
+    def retry_failed(self) -> int:
+        """
+        Queue every failed job again with a fresh attempt count
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, result = NULL, updated_at = ? WHERE status = 'failed'",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    def pending(self) -> int:
+        """
+        Jobs that are queued or still running somewhere
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()
+        return row[0]
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Job counts per status, expired leases, active workers and recent throughput
+        """
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            expired, workers = self._conn.execute(
+                "SELECT SUM(lease_until < ?), COUNT(DISTINCT worker) FROM jobs WHERE status = 'running'",
+                (now,)
+            ).fetchone()
+            finished_last_minute = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('done', 'failed') AND updated_at >= ?",
+                (now - 60,)
+            ).fetchone()[0]
+            oldest = self._conn.execute("SELECT MIN(enqueued_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        return {
+            "counts": {status: counts.get(status, 0) for status in STATUSES},
+            "expired_leases": expired or 0,
+            "active_workers": workers,
+            "finished_last_minute": finished_last_minute,
+            "oldest_queued_seconds": now - oldest if oldest else None,
+        }
+
+    def failures(self, limit: int = 10) -> List[Tuple[str, Optional[str]]]:
+        """
+        The most recently failed jobs with their error messages
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, result FROM jobs WHERE status = 'failed' ORDER BY updated_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [(url, json.loads(result).get("error") if result else None) for url, result in rows]
+
+
+def open_job_queue() -> JobQueue:
+    """
+    Open the queue at QUEUE_PATH (one connection per worker process)
+    """
+    return JobQueue(config.QUEUE_PATH, wal=config.QUEUE_WAL)
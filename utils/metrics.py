@@ -0,0 +1,281 @@
+import asyncio
+import contextvars
+import functools
+import json
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import config
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# The span of the node running in the current job (task or worker thread)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    Timing of one node run for one job, plus what it did (bytes, tokens, ...)
+    """
+
+    def __init__(self, node: str, site: str):
+        self.node = node
+        self.site = site
+        self.attributes: Dict[str, float] = {}
+        self.status = "ok"
+        self.duration = 0.0
+        self.is_open = True
+        self._started = time.perf_counter()
+
+    def add(self, name: str, value: float) -> None:
+        self.attributes[name] = self.attributes.get(name, 0) + value
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._started
+        self.is_open = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node": self.node,
+            "site": self.site,
+            "duration": self.duration,
+            "status": self.status,
+            "attributes": dict(self.attributes),
+        }
+
+
+class Metrics:
+    """
+    Collects node spans and turns them into per-node and per-site statistics
+
+    Keeps the count, total time and attribute totals of every span, and
+    the most recent max_samples durations per (node, site) for the
+    latency percentiles. Values recorded outside any node (for example a
+    Sheets flush shared by several jobs) go into plain counters.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+            self._counts: Dict[Tuple[str, str], int] = defaultdict(int)
+            self._errors: Dict[Tuple[str, str], int] = defaultdict(int)
+            self._totals: Dict[Tuple[str, str], float] = defaultdict(float)
+            self._attributes: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+            self._counters: Dict[str, float] = defaultdict(float)
+
+    def record_span(self, span: Span) -> None:
+        key = (span.node, span.site)
+        with self._lock:
+            self._samples[key].append(span.duration)
+            self._counts[key] += 1
+            self._totals[key] += span.duration
+            if span.status != "ok":
+                self._errors[key] += 1
+            for name, value in span.attributes.items():
+                self._attributes[key][name] += value
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Statistics per node, broken down per site, plus the free counters
+        """
+        with self._lock:
+            keys = sorted(self._counts)
+            nodes: Dict[str, Any] = {}
+            for node in sorted({node for node, _ in keys}):
+                node_keys = [key for key in keys if key[0] == node]
+                stats = self._stats(node_keys)
+                stats["sites"] = {site: self._stats([(node, site)]) for _, site in node_keys}
+                nodes[node] = stats
+            return {"nodes": nodes, "counters": dict(self._counters)}
+
+    def _stats(self, keys: List[Tuple[str, str]]) -> Dict[str, Any]:
+        samples = sorted(duration for key in keys for duration in self._samples[key])
+        count = sum(self._counts[key] for key in keys)
+        total = sum(self._totals[key] for key in keys)
+        attributes: Dict[str, float] = defaultdict(float)
+        for key in keys:
+            for name, value in self._attributes[key].items():
+                attributes[name] += value
+        stats = {
+            "count": count,
+            "errors": sum(self._errors[key] for key in keys),
+            "total_seconds": total,
+            "mean": total / count if count else 0.0,
+        }
+        for quantile in QUANTILES:
+            stats[f"p{round(quantile * 100)}"] = _percentile(samples, quantile)
+        stats["attributes"] = dict(attributes)
+        return stats
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus text exposition: a latency summary per node and site,
+        attribute totals as counters, and the free counters
+        """
+        summary = self.summary()
+        lines = [
+            "# HELP job_tracker_node_duration_seconds Time spent in each graph node",
+            "# TYPE job_tracker_node_duration_seconds summary",
+        ]
+        for node, stats in summary["nodes"].items():
+            for site, site_stats in stats["sites"].items():
+                labels = f'node="{node}",site="{_escape(site)}"'
+                for quantile in QUANTILES:
+                    value = site_stats[f"p{round(quantile * 100)}"]
+                    lines.append(f'job_tracker_node_duration_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+                lines.append(f"job_tracker_node_duration_seconds_sum{{{labels}}} {site_stats['total_seconds']:.6f}")
+                lines.append(f"job_tracker_node_duration_seconds_count{{{labels}}} {site_stats['count']}")
+
+        lines += [
+            "# HELP job_tracker_node_errors_total Node runs that raised or reported an error",
+            "# TYPE job_tracker_node_errors_total counter",
+        ]
+        for node, stats in summary["nodes"].items():
+            for site, site_stats in stats["sites"].items():
+                lines.append(f'job_tracker_node_errors_total{{node="{node}",site="{_escape(site)}"}} {site_stats["errors"]}')
+
+        attribute_names = sorted({
+            name for stats in summary["nodes"].values()
+            for site_stats in stats["sites"].values() for name in site_stats["attributes"]
+        })
+        for name in attribute_names:
+            metric = f"job_tracker_node_{name}_total"
+            lines += [f"# TYPE {metric} counter"]
+            for node, stats in summary["nodes"].items():
+                for site, site_stats in stats["sites"].items():
+                    if name in site_stats["attributes"]:
+                        lines.append(f'{metric}{{node="{node}",site="{_escape(site)}"}} {site_stats["attributes"][name]:g}')
+
+        for name, value in sorted(summary["counters"].items()):
+            metric = f"job_tracker_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> List[str]:
+        """
+        One summary line per node: runs, p50/p95/p99 latency and attribute totals
+        """
+        lines = []
+        for node, stats in self.summary()["nodes"].items():
+            attributes = ", ".join(f"{name}={value:g}" for name, value in sorted(stats["attributes"].items()))
+            lines.append(
+                f"{node:<8} {stats['count']:>5} runs, p50 {stats['p50']:.2f}s, "
+                f"p95 {stats['p95']:.2f}s, p99 {stats['p99']:.2f}s"
+                + (f" ({attributes})" if attributes else "")
+            )
+        return lines
+
+    def export(self, path: str) -> None:
+        """
+        Write the metrics to a file: Prometheus text for *.prom/*.txt, JSON otherwise
+        """
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _percentile(samples: List[float], quantile: float) -> float:
+    """
+    Nearest-rank percentile of sorted samples
+    """
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, math.ceil(quantile * len(samples)) - 1))
+    return samples[rank]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def site_of(url: str) -> str:
+    host = (urlsplit(url).hostname or "unknown").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+_metrics = Metrics(max_samples=config.METRICS_MAX_SAMPLES)
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def record(name: str, value: float = 1) -> None:
+    """
+    Add to an attribute of the running node's span (or to a plain counter
+    when no node is running, e.g. in a shared background flush)
+    """
+    if not config.METRICS_ENABLED:
+        return
+    span = _current_span.get()
+    if span is not None and span.is_open:
+        span.add(name, value)
+    else:
+        _metrics.increment(name, value)
+
+
+def traced(node: str):
+    """
+    Decorator timing every run of a node (sync or async) as a span
+
+    The site is taken from the job URL in the node's state. Each retry of
+    a node is a span of its own. Runs that raise are marked "error" and
+    runs that report an error_message "failed".
+    """
+    def decorator(func):
+        def start(state):
+            span = Span(node, site_of(state.get("job_url", "")))
+            return span, _current_span.set(span)
+
+        def end(span, token, result):
+            span.finish()
+            _current_span.reset(token)
+            if result is None:
+                span.status = "error"
+            elif isinstance(result, dict) and result.get("error_message"):
+                span.status = "failed"
+            _metrics.record_span(span)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(state):
+                if not config.METRICS_ENABLED:
+                    return await func(state)
+                span, token = start(state)
+                result = None
+                try:
+                    result = await func(state)
+                    return result
+                finally:
+                    end(span, token, result)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(state):
+            if not config.METRICS_ENABLED:
+                return func(state)
+            span, token = start(state)
+            result = None
+            try:
+                result = func(state)
+                return result
+            finally:
+                end(span, token, result)
+        return wrapper
+    return decorator
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from typing import Optional, Tuple
+import config
+from utils.sqlite_store import connect
+
+# A full bucket holds this many seconds' worth of the per-minute limit. OpenAI
+# enforces limits over shorter windows than a minute, so a whole minute's
+# budget must not go out in one burst.
+BURST_SECONDS = 10
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for each model
+
+    The buckets live in a SQLite file, so every job in this process and
+    every worker process on the machine draws from the same budget. A
+    caller reserves its request and estimated tokens up front and is told
+    how long to wait until the buckets have refilled enough to cover them;
+    reservations queue up behind each other, so nobody fails and the
+    combined rate stays at the limit instead of overshooting it.
+    """
+
+    def __init__(self, path: str, headroom: float = 1.0):
+        self.headroom = headroom
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                model TEXT PRIMARY KEY,
+                requests REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def limits(self, model: str) -> Tuple[float, float]:
+        """
+        (requests, tokens) per minute allowed for a model, after headroom; 0 means unlimited
+        """
+        model = model.lower()
+        rpm = config.OPENAI_RPM_LIMITS.get(model, config.OPENAI_RPM_LIMIT)
+        tpm = config.OPENAI_TPM_LIMITS.get(model, config.OPENAI_TPM_LIMIT)
+        return rpm * self.headroom, tpm * self.headroom
+
+    def reserve(self, model: str, tokens: int, requests: int = 1) -> float:
+        """
+        Take requests and tokens from the model's buckets
+
+        Returns how many seconds to wait before sending, 0 if there is
+        capacity right now.
+        """
+        rpm, tpm = self.limits(model)
+        if not rpm and not tpm:
+            return 0.0
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")  # Serializes against other processes
+            try:
+                row = self._conn.execute(
+                    "SELECT requests, tokens, updated_at FROM buckets WHERE model = ?", (model,)
+                ).fetchone()
+                max_requests, max_tokens = rpm * BURST_SECONDS / 60, tpm * BURST_SECONDS / 60
+                if row is None:
+                    available_requests, available_tokens = max_requests, max_tokens
+                else:
+                    elapsed = max(0.0, now - row[2])
+                    available_requests = min(max_requests, row[0] + elapsed * rpm / 60)
+                    available_tokens = min(max_tokens, row[1] + elapsed * tpm / 60)
+
+                available_requests -= requests
+                available_tokens -= tokens
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                    (model, available_requests, available_tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        # A negative balance is refilled at the per-minute rate
+        waits = [0.0]
+        if rpm and available_requests < 0:
+            waits.append(-available_requests * 60 / rpm)
+        if tpm and available_tokens < 0:
+            waits.append(-available_tokens * 60 / tpm)
+        return max(waits)
+
+    def acquire(self, model: str, tokens: int, requests: int = 1) -> None:
+        """
+        Block until a request of about `tokens` tokens fits in the model's limits
+        """
+        wait = self.reserve(model, tokens, requests)
+        if wait > 0:
+            print(f"Rate limit: waiting {wait:.1f}s before calling {model}...")
+            time.sleep(wait)
+
+    async def aacquire(self, model: str, tokens: int, requests: int = 1) -> None:
+        """
+        Async version of acquire (waits without blocking the event loop)
+
+        The reservation runs on a worker thread: it can wait up to the busy
+        timeout for other processes' write lock on the shared file.
+        """
+        wait = await asyncio.to_thread(self.reserve, model, tokens, requests)
+        if wait > 0:
+            print(f"Rate limit: waiting {wait:.1f}s before calling {model}...")
+            await asyncio.sleep(wait)
+
+    def settle(self, model: str, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Correct a reservation once the API reports the tokens actually used
+        """
+        _, tpm = self.limits(model)
+        if not tpm or actual_tokens == estimated_tokens:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE buckets SET tokens = MIN(?, tokens + ?) WHERE model = ?",
+                (tpm * BURST_SECONDS / 60, estimated_tokens - actual_tokens, model)
+            )
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Get the process-wide rate limiter, or None when RATE_LIMIT_ENABLED is off
+    """
+    global _limiter
+    if not config.RATE_LIMIT_ENABLED:
+        return None
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(config.RATE_LIMIT_PATH, headroom=config.RATE_LIMIT_HEADROOM)
+        return _limiter
@@ -0,0 +1,147 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import config
+from utils.sqlite_store import connect
+from utils.url_utils import canonicalize_url
+
+
+@dataclass
+class TrackedPosting:
+    """
+    A tracker row as the refresh cycles know it
+    """
+    key: str
+    url: str
+    tracker_id: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: Optional[str]
+
+
+class RefreshStore:
+    """
+    What the last refresh saw of every tracked posting
+
+    Keeps the HTTP validators for conditional GETs and a hash of the
+    cleaned page text, so a cycle can tell unchanged postings apart
+    without extracting them again. Postings that answered 404/410 are
+    marked closed and no longer checked.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                tracker_id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'open',
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_at REAL,
+                changed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_due ON postings (status, checked_at)")
+
+    def sync_tracked(self, jobs: List[Tuple[str, str]]) -> int:
+        """
+        Match the postings to the tracker's (row ID, Job URL) list
+
+        New rows are added, row IDs are updated (rows can move in a sheet)
+        and postings that left the tracker are dropped. Returns how many
+        postings are new.
+        """
+        rows = {canonicalize_url(url): (url, tracker_id) for tracker_id, url in jobs if url}
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = {key for (key,) in self._conn.execute("SELECT key FROM postings")}
+                self._conn.executemany(
+                    "INSERT INTO postings (key, url, tracker_id) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tracker_id = excluded.tracker_id",
+                    [(key, url, tracker_id) for key, (url, tracker_id) in rows.items()]
+                )
+                self._conn.executemany("DELETE FROM postings WHERE key = ?", [(key,) for key in known - rows.keys()])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows.keys() - known)
+
+    def due(self, interval: float, limit: int = 0) -> List[TrackedPosting]:
+        """
+        Open postings not checked in the last interval seconds, least recently checked first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, url, tracker_id, etag, last_modified, content_hash FROM postings "
+                "WHERE status = 'open' AND (checked_at IS NULL OR checked_at < ?) "
+                "ORDER BY checked_at IS NOT NULL, checked_at LIMIT ?",
+                (time.time() - interval, limit or -1)
+            ).fetchall()
+        return [TrackedPosting(*row) for row in rows]
+
+    def record(self, results: Dict[str, Dict[str, Any]], changed: Iterable[str] = ()) -> None:
+        """
+        Save what a cycle saw: {key: {column: value}} for status, etag,
+        last_modified and content_hash. Every posting given counts as
+        checked; the keys in changed (edited or closed postings) also get
+        a new changed_at.
+        """
+        now = time.time()
+        changed = set(changed)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, values in results.items():
+                    values = {**values, "checked_at": now}
+                    if key in changed:
+                        values["changed_at"] = now
+                    self._conn.execute(
+                        f"UPDATE postings SET {', '.join(f'{column} = ?' for column in values)} WHERE key = ?",
+                        [*values.values(), key]
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def status(self, interval: float) -> Dict[str, Any]:
+        """
+        Posting counts: open, closed, due for a check, and never checked
+        """
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM postings GROUP BY status").fetchall())
+            due, unchecked = self._conn.execute(
+                "SELECT SUM(checked_at IS NULL OR checked_at < ?), SUM(checked_at IS NULL) "
+                "FROM postings WHERE status = 'open'",
+                (time.time() - interval,)
+            ).fetchone()
+            last_check = self._conn.execute("SELECT MAX(checked_at) FROM postings").fetchone()[0]
+        return {
+            "open": counts.get("open", 0),
+            "closed": counts.get("closed", 0),
+            "due": due or 0,
+            "never_checked": unchecked or 0,
+            "last_check": last_check,
+        }
+
+    def closed(self, limit: int = 20) -> List[Tuple[str, str, float]]:
+        """
+        (Job URL, row ID, closed at) of the most recently closed postings
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, tracker_id, changed_at FROM postings WHERE status = 'closed' "
+                "ORDER BY changed_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+
+def open_refresh_store() -> RefreshStore:
+    return RefreshStore(config.REFRESH_DB_PATH)
@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+import httpx
+import openai
+from gspread.exceptions import APIError
+from langgraph.types import RetryPolicy
+import config
+
+
+class TransientError(Exception):
+    """
+    A failure that is likely to go away on its own (rate limit, overloaded server)
+    """
+
+
+# OpenAI errors worth another try (the client's own retries already ran)
+TRANSIENT_OPENAI_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,  # Includes timeouts
+    openai.InternalServerError,
+)
+
+
+def is_transient_status(status_code: int) -> bool:
+    """
+    HTTP statuses that mean "try again later": 429 and 5xx
+    """
+    return status_code == 429 or status_code >= 500
+
+
+def is_blocking_status(status_code: int) -> bool:
+    """
+    HTTP statuses that count against a host's circuit breaker
+
+    Besides the transient ones, 403 and LinkedIn's 999 are how job sites
+    turn away scrapers.
+    """
+    return status_code in (403, 999) or is_transient_status(status_code)
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Should the node that raised this be retried?
+    """
+    if isinstance(error, TransientError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return is_transient_status(error.response.status_code)
+    if isinstance(error, httpx.TransportError):  # Timeouts, refused/reset connections
+        return True
+    if isinstance(error, APIError):  # gspread: Sheets quota errors are 429s
+        return is_transient_status(error.code)
+    return isinstance(error, TRANSIENT_OPENAI_ERRORS)
+
+
+def retry_policy() -> RetryPolicy:
+    """
+    Retry policy for nodes that call out to job sites, OpenAI or Sheets
+
+    Exponential backoff with jitter; only transient errors are retried,
+    everything else fails the node right away.
+    """
+    return RetryPolicy(
+        initial_interval=config.RETRY_INITIAL_INTERVAL,
+        backoff_factor=2.0,
+        max_interval=config.RETRY_MAX_INTERVAL,
+        max_attempts=config.RETRY_MAX_ATTEMPTS,
+        jitter=True,
+        retry_on=is_transient
+    )
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host that keeps failing or blocking us
+
+    After failure_threshold failures in a row the circuit opens and
+    requests are refused for cooldown seconds. Then one trial request is
+    let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, host: str, failure_threshold: int, cooldown: float):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started = None
+
+    def allow(self) -> bool:
+        """
+        May a request to this host go out now?
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.cooldown:
+                return False
+            # One trial at a time (a trial that never reported back expires)
+            if self._trial_started is not None and now - self._trial_started < self.cooldown:
+                return False
+            self._trial_started = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                print(f"Circuit closed for {self.host}")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._trial_started is not None
+            if trial_failed or (self._opened_at is None and self._failures >= self.failure_threshold):
+                print(f"Circuit opened for {self.host} ({self._failures} failures in a row)")
+                self._opened_at = time.monotonic()
+                self._trial_started = None
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for the host of a URL
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_COOLDOWN)
+            _breakers[host] = breaker
+        return breaker
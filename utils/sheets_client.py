@@ -0,0 +1,204 @@
+import asyncio
+import os
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import gspread
+from google.oauth2.service_account import Credentials
+from google.auth.transport.requests import Request
+import config
+from utils.http_client import get_async_http_client, get_http_client
+from utils.metrics import record
+
+# Google Sheets configuration
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+_credentials: Optional[Credentials] = None
+_worksheet: Optional[gspread.Worksheet] = None
+_lock = threading.Lock()
+
+
+def get_sheet_id() -> str:
+    return os.getenv("SHEET_ID")
+
+
+def get_credentials() -> Credentials:
+    """
+    Load the service account credentials once per process
+    """
+    global _credentials
+    with _lock:
+        if _credentials is None:
+            _credentials = Credentials.from_service_account_file(
+                config.GOOGLE_CREDENTIALS_FILE,
+                scopes=SCOPES
+            )
+        return _credentials
+
+
+def get_worksheet() -> gspread.Worksheet:
+    """
+    Get the tracker worksheet (first sheet), authorized and opened once per process
+    """
+    global _worksheet
+    creds = get_credentials()
+    with _lock:
+        if _worksheet is None:
+            client = gspread.authorize(creds)
+            _worksheet = client.open_by_key(get_sheet_id()).sheet1
+        return _worksheet
+
+
+def append_rows(rows: List[List[Any]]) -> List[str]:
+    """
+    Append rows with a single API call and return their row numbers
+    """
+    record("sheets_calls")
+    response = get_worksheet().append_rows(rows)
+    return row_ids_from_range(response['updates']['updatedRange'])
+
+
+async def aappend_rows(rows: List[List[Any]]) -> List[str]:
+    """
+    Append rows through the Sheets REST API and return their row numbers
+
+    "A1" without a sheet name targets the first sheet, like get_worksheet().
+    """
+    creds = get_credentials()
+    if not creds.valid:
+        # Token refresh is a blocking call, but only happens about once an hour
+        await asyncio.to_thread(_refresh, creds)
+
+    url, request = _append_request(rows, creds)
+    record("sheets_calls")
+    response = await get_async_http_client(url).post(url, **request)
+    response.raise_for_status()
+    return row_ids_from_range(response.json()['updates']['updatedRange'])
+
+
+def append_rows_http(rows: List[List[Any]]) -> List[str]:
+    """
+    Blocking version of aappend_rows, for background threads without an event loop
+    """
+    creds = get_credentials()
+    if not creds.valid:
+        _refresh(creds)
+
+    url, request = _append_request(rows, creds)
+    record("sheets_calls")
+    response = get_http_client(url).post(url, **request)
+    response.raise_for_status()
+    return row_ids_from_range(response.json()['updates']['updatedRange'])
+
+
+def _append_request(rows: List[List[Any]], creds: Credentials) -> Tuple[str, Dict[str, Any]]:
+    url = f"{config.SHEETS_API_BASE}/{get_sheet_id()}/values/A1:append"
+    return url, {
+        "params": {"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+        "headers": {"Authorization": f"Bearer {creds.token}"},
+        "json": {"values": rows},
+    }
+
+
+def update_ranges(ranges: List[Dict[str, Any]]) -> None:
+    """
+    Overwrite cells of existing rows with a single API call
+
+    ranges are {"range": "A5:J5", "values": [[...]]} dicts on the first sheet.
+    """
+    if not ranges:
+        return
+    record("sheets_calls")
+    get_worksheet().batch_update(ranges, value_input_option="RAW")
+
+
+def row_ids_from_range(updated_range: str) -> List[str]:
+    """
+    Row numbers covered by an A1 range like "Sheet1!A5:M7" -> ["5", "6", "7"]
+    """
+    rows = [int(n) for n in re.findall(r'[A-Z]+(\d+)', updated_range.split('!')[-1])]
+    return [str(n) for n in range(rows[0], rows[-1] + 1)]
+
+
+def _refresh(creds: Credentials) -> None:
+    with _lock:
+        if not creds.valid:
+            creds.refresh(Request())
+
+
+class SheetsWriteBuffer:
+    """
+    Write-behind buffer that appends many tracker rows in one API call
+
+    Rows are flushed when flush_rows are waiting or flush_interval seconds
+    after the first buffered row, whichever comes first. Each caller gets
+    back its own row number once the batch lands.
+    
+    append is the bulk write, aappend_rows by default; pass a tracker
+    sink's aappend_rows to buffer writes to that sink instead.
+    """
+
+    def __init__(self, flush_rows: Optional[int] = None, flush_interval: Optional[float] = None,
+                 append: Optional[Callable[[List[List[Any]]], Awaitable[List[str]]]] = None):
+        self.flush_rows = config.SHEETS_FLUSH_ROWS if flush_rows is None else flush_rows
+        self.flush_interval = config.SHEETS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.append_rows = append or aappend_rows
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def append(self, row: List[Any]) -> str:
+        """
+        Buffer one row and wait for its row number
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.flush_rows:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._schedule_flush)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # The job was cancelled: a row that hasn't gone out yet is dropped,
+            # so a rerun doesn't add the posting a second time
+            self._pending = [(pending_row, f) for pending_row, f in self._pending if f is not future]
+            raise
+
+    async def flush(self) -> None:
+        """
+        Write out everything buffered so far and wait for in-flight writes
+        """
+        self._schedule_flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._write(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: List[tuple]) -> None:
+        try:
+            print(f"Appending {len(batch)} rows to the tracker...")
+            row_ids = await self.append_rows([row for row, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), row_id in zip(batch, row_ids):
+            if not future.done():
+                future.set_result(row_id)
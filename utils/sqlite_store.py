@@ -0,0 +1,24 @@
+import os
+import sqlite3
+
+
+def connect(path: str, wal: bool = True) -> sqlite3.Connection:
+    """
+    Open a SQLite database file shared by threads and worker processes
+
+    Creates the parent directory if needed and switches to WAL mode so
+    readers don't block the writer. WAL needs shared memory between the
+    processes, so files shared between machines (e.g. on NFS) have to use
+    wal=False and the classic rollback journal.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    else:
+        conn.execute("PRAGMA journal_mode=DELETE")
+    return conn
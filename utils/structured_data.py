@@ -0,0 +1,208 @@
+import html as html_lib
+import json
+import re
+from typing import Any, Dict, Iterator, Optional
+
+_JSON_LD = re.compile(
+    r'<script[^>]+type\s*=\s*["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+_META = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+_ATTR = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+EMPLOYMENT_TYPES = {
+    'FULL_TIME': 'Full-time',
+    'PART_TIME': 'Part-time',
+    'CONTRACTOR': 'Contract',
+    'TEMPORARY': 'Temporary',
+    'INTERN': 'Internship',
+    'VOLUNTEER': 'Volunteer',
+    'PER_DIEM': 'Per diem',
+    'OTHER': 'Other',
+}
+
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹', 'CAD': 'CA$', 'AUD': 'A$'}
+
+SALARY_UNITS = {'HOUR': 'per hour', 'DAY': 'per day', 'WEEK': 'per week', 'MONTH': 'per month', 'YEAR': 'per year'}
+
+
+def extract_structured_details(page_html: str) -> Dict[str, Any]:
+    """
+    Read job details from schema.org JobPosting JSON-LD or OpenGraph tags
+
+    Returns only the fields that were actually found, using the same keys
+    and formats the LLM extraction produces.
+    """
+    posting = _find_job_posting(page_html)
+    if posting is not None:
+        return _from_job_posting(posting)
+    return _from_open_graph(page_html)
+
+
+def _find_job_posting(page_html: str) -> Optional[Dict[str, Any]]:
+    for match in _JSON_LD.finditer(page_html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        for item in _walk(data):
+            types = item.get('@type')
+            types = types if isinstance(types, list) else [types]
+            if 'JobPosting' in types:
+                return item
+    return None
+
+
+def _walk(data: Any) -> Iterator[Dict[str, Any]]:
+    if isinstance(data, list):
+        for item in data:
+            yield from _walk(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _walk(data['@graph'])
+
+
+def _from_job_posting(posting: Dict[str, Any]) -> Dict[str, Any]:
+    details = {}
+
+    title = _text(posting.get('title'))
+    if title:
+        details['job_title'] = title
+
+    organization = posting.get('hiringOrganization')
+    company = _text(organization.get('name') if isinstance(organization, dict) else organization)
+    if company:
+        details['company'] = company
+
+    remote = posting.get('jobLocationType') == 'TELECOMMUTE'
+    location = _location(posting.get('jobLocation'))
+    if location:
+        details['location'] = location
+    elif remote:
+        details['location'] = 'Remote'
+    if remote:
+        details['workplace_type'] = 'Remote'
+
+    employment = posting.get('employmentType')
+    employment = employment if isinstance(employment, list) else [employment]
+    job_types = [EMPLOYMENT_TYPES.get(str(e).upper(), str(e)) for e in employment if e]
+    if job_types:
+        details['job_type'] = ', '.join(job_types)
+
+    salary = _salary(posting.get('baseSalary'))
+    if salary:
+        details['salary'] = salary
+
+    experience = _experience(posting.get('experienceRequirements'))
+    if experience:
+        details['experience_required'] = experience
+
+    skills = posting.get('skills')
+    if isinstance(skills, str):
+        skills = [s.strip() for s in skills.split(',')]
+    if isinstance(skills, list):
+        skills = [_text(s) for s in skills if _text(s)]
+        if skills:
+            details['skills_required'] = skills[:7]
+
+    if posting.get('datePosted'):
+        details['posted_date'] = str(posting['datePosted'])[:10]
+    if posting.get('validThrough'):
+        details['application_deadline'] = str(posting['validThrough'])[:10]
+
+    return details
+
+
+def _location(job_location: Any) -> Optional[str]:
+    places = job_location if isinstance(job_location, list) else [job_location]
+    names = []
+    for place in places:
+        if not isinstance(place, dict):
+            continue
+        address = place.get('address')
+        if isinstance(address, str):
+            names.append(address)
+            continue
+        if not isinstance(address, dict):
+            continue
+        country = address.get('addressCountry')
+        if isinstance(country, dict):
+            country = country.get('name')
+        parts = [address.get('addressLocality'), address.get('addressRegion') or country]
+        name = ', '.join(_text(p) for p in parts if _text(p))
+        if name and name not in names:
+            names.append(name)
+    return '; '.join(names) or None
+
+
+def _salary(base_salary: Any) -> Optional[str]:
+    if not isinstance(base_salary, dict):
+        return None
+    value = base_salary.get('value')
+    if not isinstance(value, dict):
+        value = {'value': value}
+
+    low = _number(value.get('minValue'))
+    high = _number(value.get('maxValue'))
+    single = _number(value.get('value'))
+    if low is None and high is None and single is None:
+        return None
+
+    currency = str(base_salary.get('currency') or value.get('currency') or '')
+    symbol = CURRENCY_SYMBOLS.get(currency.upper(), f"{currency} " if currency else '')
+    if low is not None and high is not None and low != high:
+        amount = f"{symbol}{low:,.0f}-{symbol}{high:,.0f}"
+    else:
+        amount = f"{symbol}{next(v for v in (single, low, high) if v is not None):,.0f}"
+
+    unit = SALARY_UNITS.get(str(value.get('unitText') or '').upper())
+    return f"{amount} {unit}" if unit else amount
+
+
+def _experience(requirements: Any) -> Optional[str]:
+    if isinstance(requirements, str):
+        return _text(requirements)
+    if isinstance(requirements, dict):
+        months = _number(requirements.get('monthsOfExperience'))
+        if months:
+            years = months / 12
+            return f"{years:g}+ years"
+    return None
+
+
+def _from_open_graph(page_html: str) -> Dict[str, Any]:
+    """
+    Fallback for pages without JSON-LD: LinkedIn's og:title reads
+    "<Company> hiring <Title> in <Location> | LinkedIn"
+    """
+    og_title = None
+    for tag in _META.findall(page_html):
+        attrs = {name.lower(): a or b for name, a, b in _ATTR.findall(tag)}
+        if attrs.get('property') == 'og:title':
+            og_title = html_lib.unescape(attrs.get('content', ''))
+            break
+    if not og_title:
+        return {}
+
+    match = re.match(r'(.+?) hiring (.+) in (.+?)(?: \| LinkedIn)?$', og_title.strip())
+    if not match:
+        return {}
+    return {
+        'company': match.group(1).strip(),
+        'job_title': match.group(2).strip(),
+        'location': match.group(3).strip(),
+    }
+
+
+def _text(value: Any) -> str:
+    if value is None or isinstance(value, (dict, list)):
+        return ''
+    return html_lib.unescape(str(value)).strip()
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,45 @@
+from typing import Optional
+
+_encoding = None
+_encoding_loaded = False
+
+
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens the OpenAI models see for a piece of text
+
+    Uses tiktoken when its encoding is available; otherwise (e.g. no network
+    to download it) falls back to the usual ~4 characters per token estimate.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, token_budget: int) -> str:
+    """
+    The start of text that fits in token_budget tokens
+    """
+    if token_budget <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:token_budget * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= token_budget:
+        return text
+    # Cut tokens can end in the middle of a multi-byte character
+    return encoding.decode(tokens[:token_budget]).rstrip("\ufffd")
+
+
+def _get_encoding() -> Optional[object]:
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")  # gpt-4o family
+        except Exception:
+            _encoding = None
+    return _encoding
@@ -0,0 +1,399 @@
+import asyncio
+import atexit
+import csv
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+import config
+from utils import sheets_client
+from utils.sqlite_store import connect
+
+# Column order of the tracker sheet (and of every row handed to a sink)
+TRACKER_COLUMNS = [
+    "Job Title",
+    "Company",
+    "Location",
+    "Job Type",
+    "Workplace Type",
+    "Salary",
+    "Experience Required",
+    "Skills Required",
+    "Posted Date",
+    "Application Deadline",
+    "Date Added",
+    "Job URL",
+    "Notes",
+]
+_SQL_COLUMNS = [name.lower().replace(" ", "_") for name in TRACKER_COLUMNS]
+
+
+class TrackerSink(ABC):
+    """
+    Where the save node writes tracker rows
+
+    append_rows() stores rows in the order of TRACKER_COLUMNS and returns
+    an ID per row. The async version runs the sync one on a worker thread
+    unless a backend has a native async write.
+    """
+
+    name = "tracker"
+
+    @abstractmethod
+    def append_rows(self, rows: List[List[Any]]) -> List[str]:
+        """
+        Store rows and return their row IDs, in order
+        """
+
+    async def aappend_rows(self, rows: List[List[Any]]) -> List[str]:
+        return await asyncio.to_thread(self.append_rows, rows)
+
+    def job_urls(self) -> List[str]:
+        """
+        Every Job URL in the tracker (to seed the duplicate index)
+        """
+        return [url for _, url in self.tracked_jobs()]
+
+    @abstractmethod
+    def tracked_jobs(self) -> List[Tuple[str, str]]:
+        """
+        (row ID, Job URL) of every row in the tracker
+        """
+
+    @abstractmethod
+    def update_rows(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Overwrite some columns of existing rows: {row ID: {column: value}}
+
+        Columns that aren't given (such as the user's Notes) are left alone.
+        """
+
+    @abstractmethod
+    def location(self) -> str:
+        """
+        Where to look at the saved rows, for the log
+        """
+
+
+class SheetsSink(TrackerSink):
+    """
+    The Google Sheets tracker: one API call per append (per bulk append when buffered)
+    """
+
+    name = "Google Sheets"
+
+    def append_rows(self, rows: List[List[Any]]) -> List[str]:
+        return sheets_client.append_rows(rows)
+
+    async def aappend_rows(self, rows: List[List[Any]]) -> List[str]:
+        return await sheets_client.aappend_rows(rows)
+
+    def tracked_jobs(self) -> List[Tuple[str, str]]:
+        job_url_column = TRACKER_COLUMNS.index("Job URL") + 1
+        urls = sheets_client.get_worksheet().col_values(job_url_column)
+        # Row 1 is the header
+        return [(str(row), url) for row, url in enumerate(urls, start=1) if row > 1 and url]
+
+    def update_rows(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        if updates:
+            sheets_client.update_ranges(_a1_ranges(updates))
+
+    def location(self) -> str:
+        return f"https://docs.google.com/spreadsheets/d/{sheets_client.get_sheet_id()}"
+
+
+class LocalSink(TrackerSink):
+    """
+    Tracker rows in a local SQLite table, written in one transaction per bulk append
+
+    Not limited by any API quota. The row IDs are the table's row IDs.
+    export() writes the table as Parquet or CSV.
+    """
+
+    name = "local tracker"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        columns = ", ".join(f"{column} TEXT" for column in _SQL_COLUMNS)
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS tracker_rows (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {columns},
+                sheet_row TEXT,
+                sync_lease REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tracker_rows_unsynced ON tracker_rows (id) WHERE sheet_row IS NULL")
+
+    def append_rows(self, rows: List[List[Any]]) -> List[str]:
+        placeholders = ", ".join("?" for _ in _SQL_COLUMNS)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row_ids = [
+                    str(self._conn.execute(
+                        f"INSERT INTO tracker_rows ({', '.join(_SQL_COLUMNS)}) VALUES ({placeholders})",
+                        [_cell(value) for value in row]
+                    ).lastrowid)
+                    for row in rows
+                ]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row_ids
+
+    def tracked_jobs(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT id, job_url FROM tracker_rows WHERE job_url IS NOT NULL").fetchall()
+        return [(str(row_id), url) for row_id, url in rows]
+
+    def update_rows(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for row_id, values in updates.items():
+                    columns = ", ".join(f"{_SQL_COLUMNS[TRACKER_COLUMNS.index(name)]} = ?" for name in values)
+                    self._conn.execute(
+                        f"UPDATE tracker_rows SET {columns} WHERE id = ?",
+                        [_cell(value) for value in values.values()] + [int(row_id)]
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def sheet_rows(self, row_ids: List[str]) -> Dict[str, str]:
+        """
+        Sheet row numbers of the given rows that have been synced already
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, sheet_row FROM tracker_rows WHERE sheet_row IS NOT NULL "
+                f"AND id IN ({', '.join('?' for _ in row_ids)})",
+                [int(row_id) for row_id in row_ids]
+            ).fetchall()
+        return {str(row_id): sheet_row for row_id, sheet_row in rows}
+
+    def location(self) -> str:
+        return self.path
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tracker_rows").fetchone()[0]
+
+    def claim_unsynced(self, limit: int, lease: float) -> List[List[Any]]:
+        """
+        Rows not yet in the sheet, leased to the caller so other processes
+        don't push them too: [[id, *columns], ...]
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT id, {', '.join(_SQL_COLUMNS)} FROM tracker_rows "
+                    "WHERE sheet_row IS NULL AND (sync_lease IS NULL OR sync_lease < ?) ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE tracker_rows SET sync_lease = ? WHERE id = ?",
+                    [(now + lease, row[0]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [list(row) for row in rows]
+
+    def mark_synced(self, row_ids: List[int], sheet_rows: List[str]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE tracker_rows SET sheet_row = ?, sync_lease = NULL WHERE id = ?",
+                    list(zip(sheet_rows, row_ids))
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def unsynced(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tracker_rows WHERE sheet_row IS NULL").fetchone()[0]
+
+    def export(self, path: str) -> int:
+        """
+        Write every row to a Parquet file (*.parquet, needs pyarrow) or CSV
+        file (anything else) with the sheet's column names; returns the row count
+        """
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(_SQL_COLUMNS)} FROM tracker_rows ORDER BY id").fetchall()
+
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise RuntimeError("Parquet export needs the 'pyarrow' package")
+            table = pyarrow.table({
+                name: [row[i] for row in rows] for i, name in enumerate(TRACKER_COLUMNS)
+            })
+            pyarrow.parquet.write_table(table, path)
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(TRACKER_COLUMNS)
+                writer.writerows(rows)
+        return len(rows)
+
+
+class MirroredSink(TrackerSink):
+    """
+    Writes go to the local tracker; a background thread copies them to the sheet
+
+    Saving never waits on the Sheets API. Every sync_interval seconds the
+    rows that aren't in the sheet yet are appended in one API call per
+    sync_batch rows. Rows are leased while they are pushed, so several
+    processes can share the local tracker. A row whose append succeeded
+    but was not marked before the process died is pushed again
+    (at-least-once).
+    """
+
+    name = "local tracker (mirrored to Google Sheets)"
+
+    def __init__(self, local: LocalSink, sync_interval: float = 10.0, sync_batch: int = 500):
+        self.local = local
+        self.sync_interval = sync_interval
+        self.sync_batch = sync_batch
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def append_rows(self, rows: List[List[Any]]) -> List[str]:
+        row_ids = self.local.append_rows(rows)
+        self._ensure_started()
+        return row_ids
+
+    def tracked_jobs(self) -> List[Tuple[str, str]]:
+        return self.local.tracked_jobs()
+
+    def update_rows(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Update the local rows, and the sheet for rows that are there already
+
+        Rows that haven't been synced yet reach the sheet with the new values.
+        """
+        if not updates:
+            return
+        self.local.update_rows(updates)
+        sheet_rows = self.local.sheet_rows(list(updates))
+        if sheet_rows:
+            sheets_client.update_ranges(_a1_ranges({
+                sheet_row: updates[row_id] for row_id, sheet_row in sheet_rows.items()
+            }))
+
+    def location(self) -> str:
+        return f"{self.local.path} (mirrored to {SheetsSink().location()})"
+
+    def sync_once(self) -> int:
+        """
+        Push one batch of unsynced rows to the sheet; returns how many were pushed
+        """
+        rows = self.local.claim_unsynced(self.sync_batch, lease=max(60.0, self.sync_interval * 6))
+        if not rows:
+            return 0
+        sheet_rows = sheets_client.append_rows_http([row[1:] for row in rows])
+        self.local.mark_synced([row[0] for row in rows], sheet_rows)
+        return len(rows)
+
+    def sync_all(self) -> int:
+        """
+        Push everything that isn't in the sheet yet (stops at the first error)
+        """
+        total = 0
+        try:
+            while True:
+                pushed = self.sync_once()
+                if not pushed:
+                    break
+                total += pushed
+        except Exception as e:
+            print(f"Error syncing tracker rows to Google Sheets: {str(e)}")
+        return total
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sync_loop, name="tracker-sheets-sync", daemon=True)
+                self._thread.start()
+                # Push what is left when the process exits
+                atexit.register(self.sync_all)
+
+    def _sync_loop(self) -> None:
+        while True:
+            time.sleep(self.sync_interval)
+            pushed = self.sync_all()
+            if pushed:
+                print(f"Synced {pushed} tracker rows to Google Sheets")
+
+
+def _cell(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _a1_ranges(updates: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sheet ranges for update_rows: one range per run of adjacent columns in a row
+    """
+    ranges = []
+    for row, values in updates.items():
+        runs: List[List[Tuple[int, Any]]] = []
+        for cell in sorted((TRACKER_COLUMNS.index(name), value) for name, value in values.items()):
+            if runs and cell[0] == runs[-1][-1][0] + 1:
+                runs[-1].append(cell)
+            else:
+                runs.append([cell])
+        for run in runs:
+            first, last = chr(ord("A") + run[0][0]), chr(ord("A") + run[-1][0])
+            ranges.append({"range": f"{first}{row}:{last}{row}", "values": [[value for _, value in run]]})
+    return ranges
+
+
+_sink: Optional[TrackerSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_tracker_sink() -> TrackerSink:
+    """
+    Get the process-wide tracker sink chosen by TRACKER_SINK
+    ("sheets", "local" or "mirror")
+    """
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = create_tracker_sink(config.TRACKER_SINK)
+        return _sink
+
+
+def create_tracker_sink(kind: str) -> TrackerSink:
+    if kind == "sheets":
+        return SheetsSink()
+    if kind == "local":
+        return LocalSink(config.TRACKER_DB_PATH)
+    if kind == "mirror":
+        return MirroredSink(LocalSink(config.TRACKER_DB_PATH), config.TRACKER_SYNC_INTERVAL, config.TRACKER_SYNC_BATCH)
+    raise ValueError(f"Unknown TRACKER_SINK '{kind}' (expected sheets, local or mirror)")
+
+
+def tracker_status(sink: TrackerSink) -> Dict[str, Any]:
+    """
+    Row counts of a local or mirrored tracker
+    """
+    if isinstance(sink, MirroredSink):
+        return {"sink": sink.name, "path": sink.local.path, "rows": sink.local.count(), "unsynced": sink.local.unsynced()}
+    if isinstance(sink, LocalSink):
+        return {"sink": sink.name, "path": sink.path, "rows": sink.count()}
+    return {"sink": sink.name}
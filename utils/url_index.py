@@ -0,0 +1,108 @@
+import threading
+import time
+from typing import Iterable, Optional
+import config
+from utils.sqlite_store import connect
+from utils.url_utils import canonicalize_url
+
+
+class UrlIndex:
+    """
+    Local index of canonical job URLs that are already in the tracker
+
+    Lets the graph skip known postings before any network or LLM work.
+    Seeded from the tracker once, then kept current by the save node.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS tracked_urls (
+                url TEXT PRIMARY KEY,
+                tracker_id TEXT,
+                added_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._seed_lock = threading.Lock()
+        self._seed_attempted = False
+
+    def contains(self, url: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM tracked_urls WHERE url = ?", (canonicalize_url(url),)
+            ).fetchone()
+        return row is not None
+
+    def add(self, url: str, tracker_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tracked_urls VALUES (?, ?, ?)",
+                (canonicalize_url(url), tracker_id, time.time())
+            )
+
+    def add_many(self, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tracked_urls VALUES (?, NULL, ?)",
+                [(canonicalize_url(url), now) for url in urls if url]
+            )
+            self._conn.execute("COMMIT")
+
+    def is_seeded(self) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'seeded'").fetchone()
+        return row is not None
+
+    def ensure_seeded(self) -> None:
+        """
+        Load the Job URLs from the tracker the first time the index is used
+
+        Tried once per process; if the tracker can't be read the index still
+        works with the URLs saved from here on.
+        """
+        if self._seed_attempted:
+            return
+        # Concurrent jobs wait here for the one that does the seeding
+        with self._seed_lock:
+            if self._seed_attempted:
+                return
+            self._seed_attempted = True
+            if self.is_seeded():
+                return
+
+            try:
+                from utils.tracker_sink import get_tracker_sink
+                sink = get_tracker_sink()
+                print(f"Seeding tracked URL index from {sink.name}...")
+                urls = sink.job_urls()
+            except Exception as e:
+                print(f"Could not seed URL index from the tracker: {str(e)}")
+                return
+
+            self.add_many(urls)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('seeded', ?)", (str(time.time()),)
+                )
+            print(f"URL index seeded with {len(urls)} tracked jobs")
+
+
+_index: Optional[UrlIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_url_index() -> Optional[UrlIndex]:
+    """
+    Get the process-wide URL index, or None when URL_INDEX_ENABLED is off
+    """
+    global _index
+    if not config.URL_INDEX_ENABLED:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = UrlIndex(config.URL_INDEX_PATH)
+        return _index
@@ -0,0 +1,91 @@
+import re
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qs, parse_qsl, urlencode
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'refid', 'trackingid', 'trk', 'trkinfo', 'ref', 'source', 'from',
+    'gclid', 'fbclid', 'mc_cid', 'mc_eid'
+}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a job URL so the same posting always maps to the same key
+
+    Known job boards are reduced to their job ID (see SITE_CANONICALIZERS).
+    Other URLs get generic cleanup: lowercase scheme and host, no default
+    port, fragment, tracking parameters or trailing slash, sorted query.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+
+    canonicalizer = _site_canonicalizer(host)
+    if canonicalizer is not None:
+        canonical = canonicalizer(host, parts.path, parse_qs(parts.query))
+        if canonical:
+            return canonical
+
+    scheme = (parts.scheme or 'https').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
+    ]
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+def _linkedin(host: str, path: str, query: Dict[str, list]) -> Optional[str]:
+    # /jobs/view/<id>, /comm/jobs/view/<id>, /jobs/view/<title-slug>-<id>, ?currentJobId=<id>
+    match = re.search(r'/jobs/view/(?:[^/]*?-)?(\d+)(?:/|$)', path)
+    job_id = match.group(1) if match else _first(query, 'currentJobId')
+    if job_id and job_id.isdigit():
+        return f"https://www.linkedin.com/jobs/view/{job_id}"
+    return None
+
+
+def _indeed(host: str, path: str, query: Dict[str, list]) -> Optional[str]:
+    # /viewjob?jk=<id>, /rc/clk?jk=<id>, /jobs?...&vjk=<id>
+    job_id = _first(query, 'jk') or _first(query, 'vjk')
+    if job_id and re.fullmatch(r'[0-9a-fA-F]+', job_id):
+        # Country sites (uk.indeed.com, ...) list different jobs, keep them apart
+        if host in ('indeed.com', 'm.indeed.com'):
+            host = 'www.indeed.com'
+        return f"https://{host}/viewjob?jk={job_id.lower()}"
+    return None
+
+
+def _glassdoor(host: str, path: str, query: Dict[str, list]) -> Optional[str]:
+    # /job-listing/<slug>.htm?jl=<id>, /partner/jobListing.htm?jobListingId=<id>
+    job_id = _first(query, 'jl') or _first(query, 'jobListingId')
+    if job_id and job_id.isdigit():
+        return f"https://www.glassdoor.com/job-listing/?jl={job_id}"
+    return None
+
+
+# Per-site rules: host suffix -> function returning the canonical URL (or None)
+SITE_CANONICALIZERS: Dict[str, Callable[[str, str, Dict[str, list]], Optional[str]]] = {
+    'linkedin.com': _linkedin,
+    'indeed.com': _indeed,
+    'glassdoor.com': _glassdoor,
+}
+
+
+def _site_canonicalizer(host: str):
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        canonicalizer = SITE_CANONICALIZERS.get('.'.join(labels[i:]))
+        if canonicalizer is not None:
+            return canonicalizer
+    return None
+
+
+def _first(query: Dict[str, list], key: str) -> Optional[str]:
+    values = query.get(key)
+    return values[0] if values else None
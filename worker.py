@@ -0,0 +1,278 @@
+"""
+Worker mode: job URLs go into a durable queue and N worker processes drain it
+
+    python worker.py enqueue urls.txt
+    python worker.py work --processes 8
+    python worker.py status
+
+Every process runs the graph on its own cores, so parsing is no longer
+limited to one GIL. Workers on other machines can share the queue through
+a shared filesystem (set QUEUE_WAL=false there).
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional
+import config
+from graph import job_tracker_app, create_job_tracker_graph
+from main import run_job_async, open_checkpointer
+from nodes import ExtractionBatcher
+from utils.http_client import aclose_http_clients
+from utils.job_queue import JobQueue, open_job_queue
+from utils.sheets_client import SheetsWriteBuffer
+from utils.tracker_sink import get_tracker_sink
+
+
+class QueueWorker:
+    """
+    Claims jobs from the queue, runs them through the graph and records the results
+
+    Keeps up to max_concurrent jobs running and renews their leases while
+    they run. When checkpointing is on, a job that was claimed before (its
+    earlier worker died) continues from its last checkpoint.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: str,
+        max_concurrent: int = 5,
+        extract_batch_size: int = 0,
+        lean_state: bool = config.LEAN_STATE,
+        drain: bool = False
+    ):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.max_concurrent = max_concurrent
+        self.extract_batch_size = extract_batch_size
+        self.lean_state = lean_state
+        self.drain = drain
+        self.visibility_timeout = config.QUEUE_VISIBILITY_TIMEOUT
+        self.processed = {"done": 0, "failed": 0, "lost": 0}
+        self.started = 0
+        self._running: Dict[str, asyncio.Task] = {}
+
+    async def run(self) -> Dict[str, int]:
+        """
+        Work until the queue is empty (with drain) or until cancelled
+        """
+        sheets_buffer = SheetsWriteBuffer(
+            flush_rows=min(config.SHEETS_FLUSH_ROWS, self.max_concurrent),
+            append=get_tracker_sink().aappend_rows
+        )
+        run_config = {"configurable": {"sheets_buffer": sheets_buffer, "lean_state": self.lean_state}}
+        if self.extract_batch_size > 1:
+            run_config["configurable"]["extract_batcher"] = ExtractionBatcher(batch_size=self.extract_batch_size)
+
+        app = job_tracker_app
+        resources = AsyncExitStack()
+        if config.CHECKPOINT_ENABLED:
+            app = create_job_tracker_graph(
+                checkpointer=await resources.enter_async_context(open_checkpointer(config.CHECKPOINT_PATH))
+            )
+        heartbeat = asyncio.create_task(self._heartbeat())
+
+        try:
+            while True:
+                claimed = []
+                free = self.max_concurrent - len(self._running)
+                if free > 0:
+                    claimed = await asyncio.to_thread(
+                        self.queue.claim, self.worker_id, free, self.visibility_timeout, config.QUEUE_MAX_ATTEMPTS
+                    )
+                for key, url, attempt in claimed:
+                    self.started += 1
+                    self._running[key] = asyncio.create_task(
+                        self._process(app, run_config, key, url, attempt, f"job {self.started}")
+                    )
+
+                if self._running:
+                    await asyncio.wait(
+                        self._running.values(), timeout=config.QUEUE_POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED
+                    )
+                elif not claimed:
+                    if self.drain and await asyncio.to_thread(self.queue.pending) == 0:
+                        break
+                    await asyncio.sleep(config.QUEUE_POLL_INTERVAL)
+        finally:
+            heartbeat.cancel()
+            for task in self._running.values():
+                task.cancel()
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+            released = self.queue.release(self.worker_id)
+            if released:
+                print(f"Worker {self.worker_id}: put {released} unfinished jobs back in the queue")
+            await sheets_buffer.flush()
+            await aclose_http_clients()
+            await resources.aclose()
+
+        return self.processed
+
+    async def _process(self, app, run_config: dict, key: str, url: str, attempt: int, label: str) -> None:
+        try:
+            job_config = run_config
+            if config.CHECKPOINT_ENABLED:
+                job_config = {
+                    **run_config,
+                    "configurable": {**run_config["configurable"], "thread_id": f"queue:{key}"}
+                }
+            result = await run_job_async(url, label, job_config, app, resume=attempt > 1 and config.CHECKPOINT_ENABLED)
+
+            status = "done" if result["status"] in ("success", "duplicate") else "failed"
+            record = {
+                "status": result["status"],
+                "seconds": result["seconds"],
+                "worker": self.worker_id,
+                "attempt": attempt,
+            }
+            if result.get("details"):
+                record["details"] = result["details"]
+            if result.get("error"):
+                record["error"] = result["error"]
+
+            if await asyncio.to_thread(self.queue.complete, key, self.worker_id, status, record):
+                self.processed[status] += 1
+            else:
+                # The lease ran out and another worker has the job now
+                self.processed["lost"] += 1
+        finally:
+            self._running.pop(key, None)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            if self._running:
+                await asyncio.to_thread(self.queue.extend, self.worker_id, list(self._running), self.visibility_timeout)
+
+
+def run_worker(number: int, max_concurrent: int, extract_batch_size: int, lean_state: bool, drain: bool) -> None:
+    """
+    Entry point of one worker process
+    """
+    if multiprocessing.parent_process() is not None:
+        # Started by start_workers, which passes Ctrl+C on as SIGTERM
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    worker = QueueWorker(open_job_queue(), worker_id, max_concurrent, extract_batch_size, lean_state, drain)
+
+    async def serve() -> Dict[str, int]:
+        # SIGTERM stops the worker like Ctrl+C, so it hands its unfinished jobs back
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        return await worker.run()
+
+    start_time = time.time()
+    try:
+        processed = asyncio.run(serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        processed = worker.processed
+    print(f"Worker {number} ({worker_id}): {processed['done']} done, {processed['failed']} failed"
+          + (f", {processed['lost']} lost to other workers" if processed["lost"] else "")
+          + f" in {time.time() - start_time:.1f} seconds")
+
+
+def start_workers(processes: int, max_concurrent: int, extract_batch_size: int, lean_state: bool, drain: bool) -> None:
+    """
+    Run worker processes until they finish (with drain) or are interrupted
+    """
+    if processes == 1:
+        run_worker(1, max_concurrent, extract_batch_size, lean_state, drain)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=run_worker, args=(number, max_concurrent, extract_batch_size, lean_state, drain),
+                        name=f"job-tracker-worker-{number}")
+        for number in range(1, processes + 1)
+    ]
+    for process in workers:
+        process.start()
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join()
+
+
+def enqueue(queue: JobQueue, sources: List[str]) -> None:
+    urls = []
+    for source in sources:
+        if os.path.isfile(source):
+            with open(source, encoding="utf-8") as f:
+                urls.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+        else:
+            urls.append(source)
+    added = queue.enqueue(urls)
+    print(f"Queued {added} new jobs ({len(urls) - added} already in the queue)")
+
+
+def print_status(queue: JobQueue, as_json: bool = False) -> None:
+    status = queue.status()
+    if as_json:
+        failures = [{"url": url, "error": error} for url, error in queue.failures()]
+        print(json.dumps({**status, "recent_failures": failures}, indent=2))
+        return
+
+    counts = status["counts"]
+    print(f"Queued: {counts['queued']}")
+    print(f"Running: {counts['running']} ({status['active_workers']} workers"
+          + (f", {status['expired_leases']} with expired leases" if status["expired_leases"] else "") + ")")
+    print(f"Done: {counts['done']}")
+    print(f"Failed: {counts['failed']}")
+    print(f"Finished in the last minute: {status['finished_last_minute']}")
+    if status["oldest_queued_seconds"] is not None:
+        print(f"Oldest queued job: {status['oldest_queued_seconds']:.0f} seconds")
+
+    failures = queue.failures()
+    if failures:
+        print("\nRecent failures:")
+        for url, error in failures:
+            print(f"  {url}: {error or 'unknown error'}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process job URLs from a durable queue with worker processes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="Add job URLs to the queue")
+    enqueue_parser.add_argument("sources", nargs="+", help="Job URLs, or files with one URL per line")
+
+    work_parser = commands.add_parser("work", help="Start worker processes")
+    work_parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                             help="Worker processes (default: one per CPU)")
+    work_parser.add_argument("--max-concurrent", type=int, default=5, help="Jobs each process runs at the same time")
+    work_parser.add_argument("--extract-batch-size", type=int, default=0, help="Postings per LLM request (0 = one each)")
+    work_parser.add_argument("--lean-state", action="store_true", default=config.LEAN_STATE,
+                             help="Spill page HTML and parsed text to disk")
+    work_parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty instead of waiting for more")
+
+    status_parser = commands.add_parser("status", help="Show queue progress")
+    status_parser.add_argument("--json", action="store_true", help="Print the status as JSON")
+
+    commands.add_parser("retry", help="Queue failed jobs again")
+
+    args = parser.parse_args(argv)
+    if args.command == "work" and (args.processes < 1 or args.max_concurrent < 1):
+        parser.error("--processes and --max-concurrent must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.command == "work":
+        start_workers(args.processes, args.max_concurrent, args.extract_batch_size, args.lean_state, args.drain)
+    elif args.command == "enqueue":
+        enqueue(open_job_queue(), args.sources)
+    elif args.command == "status":
+        print_status(open_job_queue(), args.json)
+    elif args.command == "retry":
+        print(f"Queued {open_job_queue().retry_failed()} failed jobs again")